@@ -1,7 +1,8 @@
 import ctypes
 import os
 import sys
-from ctypes import c_size_t, POINTER, c_ulong
+import numpy as np
+from ctypes import c_size_t, POINTER, c_ulong, c_int64, c_uint8
 
 """
 The ODDS (Ortho-Derivative Differential Spectrum) and ODWS (Ortho-Derivative Walsh Spectrum)
@@ -37,6 +38,13 @@ spectra_lib.compute_differential_spectrum.restype = None
 spectra_lib.compute_extended_walsh_spectrum.argtypes = [POINTER(VbfTt), POINTER(c_size_t)]
 spectra_lib.compute_extended_walsh_spectrum.restype = None
 
+# Libraries built before compare_invariant_columns existed still load; callers check this flag.
+HAS_COMPARE_BATCH = hasattr(spectra_lib, "compare_invariant_columns")
+if HAS_COMPARE_BATCH:
+    spectra_lib.compare_invariant_columns.argtypes = [POINTER(c_int64), c_size_t, c_size_t,
+                                                      POINTER(c_int64), POINTER(c_uint8)]
+    spectra_lib.compare_invariant_columns.restype = None
+
 # --------------------------------------------------------------
 # Internal helper to create the C structure from a Python list
 # --------------------------------------------------------------
@@ -85,4 +93,16 @@ def vbf_tt_extended_walsh_spectrum(tt_values, dimension):
         if spectrum_counts[i] > 0:
             spectrum[i] = spectrum_counts[i]
 
-    return spectrum
\ No newline at end of file
+    return spectrum
+
+def vbf_compare_batch(input_values, db_columns):
+    # Returns a uint8 mask with 1 for every database column equal to input_values (one C call).
+    db_columns = np.ascontiguousarray(db_columns, dtype=np.int64)
+    input_values = np.ascontiguousarray(input_values, dtype=np.int64)
+    key_count, db_count = db_columns.shape
+    match_mask = np.empty(db_count, dtype=np.uint8)
+
+    spectra_lib.compare_invariant_columns(db_columns.ctypes.data_as(POINTER(c_int64)), key_count, db_count,
+                                          input_values.ctypes.data_as(POINTER(c_int64)),
+                                          match_mask.ctypes.data_as(POINTER(c_uint8)))
+    return match_mask
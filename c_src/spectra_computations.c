@@ -121,14 +121,18 @@ void compute_differential_spectrum(const vbf_tt *f, size_t *spectrum_counts) {
     free(od.vbf_tt_values);
 }
 
-/* Compute the Walsh transform */
-static long walsh_transform(const vbf_tt *F, unsigned long a, unsigned long b) {
-    long sum = 0;
-    for (unsigned long x = 0; x < F->vbf_tt_number_of_entries; ++x) {
-        bool exponent = dot_bits(a, x) ^ dot_bits(b, F->vbf_tt_values[x]);
-        sum += exponent ? -1 : 1;
+/* In-place fast Walsh-Hadamard transform of a length-N (power of two) array of +1/-1 values */
+static void fast_walsh_hadamard_transform(long *values, size_t N) {
+    for (size_t h = 1; h < N; h <<= 1) {
+        for (size_t i = 0; i < N; i += h << 1) {
+            for (size_t j = i; j < i + h; ++j) {
+                long x = values[j];
+                long y = values[j + h];
+                values[j]     = x + y;
+                values[j + h] = x - y;
+            }
+        }
     }
-    return sum;
 }
 
 /************************************************************************************************
@@ -144,10 +148,23 @@ void compute_extended_walsh_spectrum(const vbf_tt *f, size_t *spectrum_counts) {
     /* Zero out the array for accumulation */
     memset(spectrum_counts, 0, sizeof(size_t) * (N + 1));
 
-    /* For each (a,b), measure the Walsh transform of orthoderivative */
-    for (unsigned long a = 0; a < N; ++a) {
-        for (unsigned long b = 1; b < N; ++b) {
-            long wc = walsh_transform(&od, a, b);
+    long *walsh_values = (long *)malloc(N * sizeof(long));
+    if (!walsh_values) {
+        fprintf(stderr, "[ERROR] Memory allocation for walsh_values[] failed.\n");
+        free(od.vbf_tt_values);
+        return;
+    }
+
+    /* For each component b, one transform of (-1)^(b . od(x)) gives the Walsh
+     * coefficients of the orthoderivative at every a in O(N log N). */
+    for (unsigned long b = 1; b < N; ++b) {
+        for (unsigned long x = 0; x < N; ++x) {
+            walsh_values[x] = dot_bits(b, od.vbf_tt_values[x]) ? -1 : 1;
+        }
+        fast_walsh_hadamard_transform(walsh_values, N);
+
+        for (unsigned long a = 0; a < N; ++a) {
+            long wc = walsh_values[a];
             size_t abs_wc = (wc >= 0) ? wc : -wc;
             if (abs_wc <= N) {
                 spectrum_counts[abs_wc]++;
@@ -157,5 +174,24 @@ void compute_extended_walsh_spectrum(const vbf_tt *f, size_t *spectrum_counts) {
         }
     }
 
+    free(walsh_values);
     free(od.vbf_tt_values);
-}
\ No newline at end of file
+}
+
+/************************************************************************************************
+ * Batch invariant comparison
+ ************************************************************************************************/
+void compare_invariant_columns(const int64_t *db_columns, size_t key_count, size_t db_count,
+                               const int64_t *input_values, uint8_t *match_mask) {
+    /* db_columns is row-major with one row per invariant, so every inner loop is a contiguous
+     * branch-free scan that the compiler vectorizes (e.g. AVX2 at -O3 -march=native). */
+    memset(match_mask, 1, db_count);
+
+    for (size_t k = 0; k < key_count; ++k) {
+        const int64_t *column = db_columns + k * db_count;
+        const int64_t value = input_values[k];
+        for (size_t i = 0; i < db_count; ++i) {
+            match_mask[i] &= (uint8_t)(column[i] == value);
+        }
+    }
+}
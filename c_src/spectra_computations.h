@@ -7,6 +7,7 @@ extern "C" {
 
 #include <stddef.h>
 #include <stdbool.h>
+#include <stdint.h>
 
 #ifdef _WIN32
   #define EXPORT __declspec(dllexport)
@@ -28,6 +29,10 @@ EXPORT void compute_extended_walsh_spectrum(const vbf_tt* f, size_t* spectrum_co
 /* Compute_differential_spectrum: Ortho-Derivative Differential Spectrum (ODDS) */
 EXPORT void compute_differential_spectrum(const vbf_tt* f, size_t* spectrum_counts);
 
+/* Compare_invariant_columns: match one input invariant vector against key_count x db_count columns */
+EXPORT void compare_invariant_columns(const int64_t* db_columns, size_t key_count, size_t db_count,
+                                      const int64_t* input_values, uint8_t* match_mask);
+
 #ifdef __cplusplus
 }
 #endif
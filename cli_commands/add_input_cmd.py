@@ -14,6 +14,8 @@ from representations.truth_table_representation import TruthTableRepresentation
 from cli_commands.cli_utils import format_generic_vbf, build_vbf_from_dict
 from registry import REG
 
+_SEPARATOR = "-" * 100
+
 
 @click.command("add-input")
 @click.option("--poly", "-p", multiple=True,
@@ -231,12 +233,14 @@ def add_input_cli(poly, dim_n, irr_poly, tt_file, poly_file, citation, citation_
     save_input_vbfs_and_matches(vbf_list)
 
     if final_entries:
-        click.echo("\nNewly Added VBFs:")
-        click.echo("-" * 100)
-        for index_added, entry_dictionary in enumerate(final_entries, start=1):
-            print_object = build_vbf_from_dict(entry_dictionary)
-            click.echo(format_generic_vbf(print_object, f"VBF {index_added}"))
-            click.echo("-" * 100)
+        # The entries were just built from these objects, so they are printed without a rebuild.
+        # The listing is written with one echo instead of one per line.
+        output_lines = ["\nNewly Added VBFs:", _SEPARATOR]
+        for index_added in range(1, len(final_entries) + 1):
+            print_object = results_map[index_added - 1]
+            output_lines.append(format_generic_vbf(print_object, f"VBF {index_added}"))
+            output_lines.append(_SEPARATOR)
+        click.echo("\n".join(output_lines))
 
 
 def _compute_diff_uni_aggregator_task(task_data):
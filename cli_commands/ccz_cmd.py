@@ -32,19 +32,24 @@ def ccz_equivalence_cli(single_vbf_index, max_threads):
 
     # Build concurrency tasks.
     concurrency_tasks: List[Tuple[int, int, VBF, VBF]] = []
+    no_match_lines = []
     for offset_index, single_vbf_dictionary in enumerate(chosen_vbf_dicts):
         actual_index = chosen_indices[offset_index]
         candidate_vbf_object = build_vbf_from_dict(single_vbf_dictionary)
 
         vbf_matches = single_vbf_dictionary.get("matches", [])
         if not vbf_matches:
-            click.echo(f"No matches for input VBF {actual_index}.")
+            no_match_lines.append(f"No matches for input VBF {actual_index}.")
 
         # Build tasks for each of its matches.
         for match_index, match_dictionary in enumerate(single_vbf_dictionary.get("matches", [])):
             match_vbf_object = build_vbf_from_dict(match_dictionary)
             concurrency_tasks.append((actual_index, match_index, candidate_vbf_object, match_vbf_object))
 
+    # The notices are written with one echo instead of one per input VBF.
+    if no_match_lines:
+        click.echo("\n".join(no_match_lines))
+
     # Run concurrency. The eq_key="ccz" will map to CCZEquivalenceTest.
     updated_vbf_list = run_equivalence_on_matches(
         input_vbf_list=input_vbf_list,
@@ -1,15 +1,36 @@
-from invariants import reorder_invariants
-from typing import Dict, Any
+from invariants import ALL_INVARIANT_KEYS, ordered_invariants, reorder_invariants
+import functools
+from collections import defaultdict
+import numpy as np
+from typing import Dict, Any, List, Tuple
 from vbf_object import VBF
 from registry import REG
 
 
+# One shared string per irreducible polynomial: thousands of VBFs of a field share the same one,
+# and pickle writes a shared object only once per task payload.
+_IRR_POLY_INTERN: Dict[Any, Any] = {}
+
+
+def intern_irr_poly(irr_poly):
+    # Returns the canonical object for an irr_poly value; unhashable values are returned as they are.
+    try:
+        return _IRR_POLY_INTERN.setdefault(irr_poly, irr_poly)
+    except TypeError:
+        return irr_poly
+
+
 def polynomial_to_str(univ_poly):
     # Convert a list of ([coefficient_exp, monomial_exp]) into a univariate polynomial string.
     # Example: [(1,9),(11,6),(0,3)] -> "a*x^9 + a^11*x^6 + x^3"
+    # The same polynomials are formatted on every save (inputs, matches, equivalence records).
     if not univ_poly:
         return "0"
+    return _polynomial_terms_to_str(tuple(tuple(term) for term in univ_poly))
+
 
+@functools.lru_cache(maxsize=4096)
+def _polynomial_terms_to_str(univ_poly: Tuple[Tuple[int, int], ...]) -> str:
     # Sort by monomial_exp descending.
     sorted_poly = sorted(univ_poly, key=lambda t: t[1], reverse=True)
 
@@ -79,23 +100,48 @@ def format_generic_vbf(vbf: VBF, label: str) -> str:
     else:
         poly_str = "Truth Table based VBF"
 
+    return _format_vbf_lines(label, poly_str, vbf.irr_poly, vbf.invariants)
+
+
+def format_generic_vbf_from_dict(vbf_dictionary: Dict[str, Any], label: str) -> str:
+    # Same text as format_generic_vbf(build_vbf_from_dict(vbf_dictionary), label). Stored dicts
+    # carry the polynomial and irr_poly already, so no VBF is built just to print them.
+    if not vbf_dictionary.get("poly") or not vbf_dictionary.get("irr_poly"):
+        return format_generic_vbf(build_vbf_from_dict(vbf_dictionary), label)
+
+    # Matches without invariants print as "{}"; there is nothing to reorder for them.
+    invariants = vbf_dictionary.get("invariants") or {}
+    return _format_vbf_lines(label, polynomial_to_str(vbf_dictionary["poly"]), vbf_dictionary["irr_poly"],
+                             ordered_invariants(invariants) if invariants else invariants)
+
+
+def _format_vbf_lines(label: str, poly_str: str, irr_poly: str, invariants: Dict[str, Any]) -> str:
     lines = []
     lines.append(f"{label}:")
-    lines.append(f"  Univariate polynomial representation: {poly_str}, irreducible_poly='{vbf.irr_poly}'")
-    inv_str = _invariants_str_with_linebreak(vbf.invariants)
+    lines.append(f"  Univariate polynomial representation: {poly_str}, irreducible_poly='{irr_poly}'")
+    inv_str = _invariants_str_with_linebreak(invariants)
     lines.append(f"  Invariants: {inv_str}")
 
     return "\n".join(lines)
 
 
+def cached_tt_list(vbf_dictionary: Dict[str, Any]) -> List[int]:
+    # Loaded VBF dicts hold cached_tt as a uint16 array; VBF objects and the invariant code use lists.
+    cached_tt = vbf_dictionary.get("cached_tt", [])
+    if isinstance(cached_tt, np.ndarray):
+        return cached_tt.tolist()
+    return cached_tt
+
+
 def build_vbf_from_dict(vbf_dictionary: Dict[str, Any]) -> VBF:
     # Build (or reconstruct) a VBF from a dictionary.
     poly_list = vbf_dictionary.get("poly", [])
     field_n   = vbf_dictionary.get("field_n", 0)
     irr_poly  = vbf_dictionary.get("irr_poly", "")
-    cached_tt = vbf_dictionary.get("cached_tt", [])
+    cached_tt = cached_tt_list(vbf_dictionary)
 
     if poly_list:
+        # A fresh VBF per call; the irr_poly check inside VBF is cached per polynomial string.
         vbf_object = VBF(poly_list, field_n, irr_poly)
         if cached_tt:
             vbf_object._cached_tt_list = cached_tt
@@ -112,6 +158,38 @@ def build_vbf_from_dict(vbf_dictionary: Dict[str, Any]) -> VBF:
     return vbf_object
 
 
+def vbf_task_payload(vbf_dictionary: Dict[str, Any]) -> Dict[str, Any]:
+    # The fields build_vbf_from_dict reads. Worker tasks carry only these, not the matches.
+    return {key: vbf_dictionary[key] for key in ("poly", "field_n", "irr_poly", "cached_tt", "invariants")
+            if key in vbf_dictionary}
+
+
+def vbf_signature(vbf_dictionary: Dict[str, Any]) -> tuple:
+    # Identifies a VBF by the fields build_vbf_from_dict reads, apart from the invariants; VBFs with
+    # equal signatures have the same invariants.
+    poly_key = tuple(tuple(term) for term in vbf_dictionary.get("poly", []))
+    return (poly_key, vbf_dictionary.get("field_n"), vbf_dictionary.get("irr_poly"),
+            tuple(cached_tt_list(vbf_dictionary)))
+
+
+def indices_by_signature(vbf_list: List[Dict[str, Any]], indices) -> Dict[tuple, List[int]]:
+    # Groups the given indices of vbf_list by vbf_signature, so identical VBFs are computed once.
+    signature_indices: Dict[tuple, List[int]] = defaultdict(list)
+    for vbf_index in indices:
+        signature_indices[vbf_signature(vbf_list[vbf_index])].append(vbf_index)
+    return signature_indices
+
+
+def merge_group_invariants(vbf_list: List[Dict[str, Any]], idx_list: List[int], invariants: Dict[str, Any]) -> None:
+    # Stores the invariants computed for idx_list[0] and copies the computed ones to its duplicates,
+    # which keep their own other keys (e.g. citation).
+    vbf_list[idx_list[0]]["invariants"] = invariants
+    computed_invariants = {key: invariants[key] for key in ALL_INVARIANT_KEYS if key in invariants}
+    for duplicate_index in idx_list[1:]:
+        vbf_list[duplicate_index]["invariants"] = ordered_invariants(
+            {**vbf_list[duplicate_index].get("invariants", {}), **computed_invariants})
+
+
 def get_custom_ordered_invariant_keys() -> list[str]:
     # Returns a list of invariant keys in a custom order.
     all_keys = REG.keys("invariant")
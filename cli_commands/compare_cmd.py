@@ -1,19 +1,42 @@
 import click
-import json
 import concurrent.futures
-from typing import Tuple, List, Dict, Any
+import functools
+from collections import defaultdict
+import numpy as np
+from typing import Tuple, List, Dict, Any, Callable
 from storage.json_storage_utils import (
     load_input_vbfs_and_matches,
     save_input_vbfs_and_matches,
 )
-from storage_pandas import load_objects_for_dimension_pandas
-from cli_commands.cli_utils import build_vbf_from_dict, get_custom_ordered_invariant_keys
+from storage_pandas import (
+    load_dataframe_for_dimension,
+    invariant_keys_in_dataframe,
+    parse_spectrum,
+    vbf_objects_from_dataframe,
+)
+from cli_commands.cli_utils import (build_vbf_from_dict, cached_tt_list, get_custom_ordered_invariant_keys,
+                                    indices_by_signature, merge_group_invariants, vbf_task_payload)
+from cli_commands.worker_pool import map_chunksize
+from vbf_object import VBF
 from registry import REG
+from c_spectra_bindings import HAS_COMPARE_BATCH, vbf_compare_batch
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional, the candidate scan falls back to numpy without it.
+    njit = None
+
 
-# Build a global registry dictionary from the callables.
-_ALL_INVARIANT_FUNCTIONS: Dict[str, Any] = {}
-for key in REG.keys("invariant"):
-    _ALL_INVARIANT_FUNCTIONS[key] = REG.get("invariant", key)
+@functools.lru_cache(maxsize=None)
+def _all_invariant_functions() -> Dict[str, Any]:
+    # Registry dictionary of the invariant callables, built on first use (once per process).
+    return {key: REG.get("invariant", key) for key in REG.keys("invariant")}
+
+
+# Set in each worker by _init_compare_worker; constant for one compare run. The (key, callable)
+# pairs are resolved once, in the order compare requests them, instead of once per VBF and key.
+_WORKER_INVARIANT_DISPATCH: Tuple[Tuple[str, Callable[[VBF], None]], ...] = ()
 
 
 @click.command("compare")
@@ -44,28 +67,24 @@ def compare_cli(user_requested_key: str, max_threads: int | None) -> None:
                        f"which differs from {dimension_n}.")
             return
 
-    # Load the database VBFs for dimension_n.
-    db_vbf_list = load_objects_for_dimension_pandas(dimension_n)
-    if not db_vbf_list:
+    # Read the database table for dimension_n. The VBF objects are rebuilt further down,
+    # while the workers compute the missing input invariants.
+    db_dataframe = load_dataframe_for_dimension(dimension_n, is_apn=True)
+    if db_dataframe.empty:
         click.echo(f"No VBFs found in the database for GF(2^{dimension_n}).")
         return
-    
-
-    # If an VBF is stored with "is_apn" == True, we set "diff_uni" = 2.
-    for db_vbf_object in db_vbf_list:
-        if db_vbf_object.invariants.get("is_apn") is True:
-            db_vbf_object.invariants["diff_uni"] = 2
 
     # Determine which invariants to compare.
     if user_requested_key == "all":
-        user_invariants = list(_ALL_INVARIANT_FUNCTIONS.keys())
+        user_invariants = list(_all_invariant_functions().keys())
     else:
         user_invariants = [user_requested_key]
 
     # Gather the invariants that actually exist in the database.
-    db_invariant_keys = set()
-    for db_vbf in db_vbf_list:
-        db_invariant_keys.update(db_vbf.invariants.keys())
+    db_invariant_keys = invariant_keys_in_dataframe(db_dataframe)
+    # If an VBF is stored with "is_apn" == True, we set "diff_uni" = 2 (see below).
+    if "is_apn" in db_dataframe.columns and db_dataframe["is_apn"].astype(bool).any():
+        db_invariant_keys.add("diff_uni")
 
     feasible_invariants = set(user_invariants).intersection(db_invariant_keys)
     if not feasible_invariants:
@@ -74,23 +93,65 @@ def compare_cli(user_requested_key: str, max_threads: int | None) -> None:
 
     final_invariant_list = list(feasible_invariants)
 
-    # Compute missing invariants for each input VBF (in parallel).
-    concurrency_tasks = [(idx, vbf_dict, final_invariant_list) 
-                         for idx, vbf_dict in enumerate(input_vbf_list)]
-    updated_dict_map: Dict[int, Dict[str, Any]] = {}
-
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_threads) as executor:
-        future_map = {executor.submit(_ensure_invariants_for_input_vbf, task): task[0]
-                      for task in concurrency_tasks}
-        for done_future in concurrent.futures.as_completed(future_map):
-            idx_value = future_map[done_future]
-            updated_dict_map[idx_value] = done_future.result()
-
-    # Merge concurrency results.
-    for idx, new_dict in updated_dict_map.items():
-        input_vbf_list[idx] = new_dict
+    # Identical input VBFs are computed and searched once; the results are copied to the duplicates.
+    signature_indices = indices_by_signature(input_vbf_list, range(len(input_vbf_list)))
+    input_signatures: List[tuple] = [()] * len(input_vbf_list)
+    for signature, idx_list in signature_indices.items():
+        for idx in idx_list:
+            input_signatures[idx] = signature
+
+    # Compute missing invariants for each distinct input VBF (in parallel). Groups whose inputs
+    # all carry every compared invariant are not sent to the workers. map() submits every task
+    # right away, so the workers run while the database objects are rebuilt below.
+    concurrency_tasks = [(idx_list[0], vbf_task_payload(input_vbf_list[idx_list[0]]))
+                         for idx_list in signature_indices.values()
+                         if any(_missing_invariants(input_vbf_list[idx], final_invariant_list) for idx in idx_list)]
+    updated_invariants_map: Dict[int, Dict[str, Any]] = {}
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_threads, initializer=_init_compare_worker,
+                                                initargs=(tuple(final_invariant_list),)) as executor:
+        chunk_size = map_chunksize(len(concurrency_tasks), max_threads)
+        updated_invariants = executor.map(_ensure_invariants_for_input_vbf, concurrency_tasks, chunksize=chunk_size)
+
+        db_vbf_list = vbf_objects_from_dataframe(db_dataframe, dimension_n)
+
+        # If an VBF is stored with "is_apn" == True, we set "diff_uni" = 2.
+        for db_vbf_object in db_vbf_list:
+            if db_vbf_object.invariants.get("is_apn") is True:
+                db_vbf_object.invariants["diff_uni"] = 2
+
+        # Only database VBFs that carry every compared invariant can ever match.
+        eligible_db_list = [
+            db_vbf for db_vbf in db_vbf_list
+            if db_vbf.field_n == dimension_n and all(key in db_vbf.invariants for key in final_invariant_list)
+        ]
+
+        # Integer-valued invariants and ODDS/ODWS hashes are matched in one compiled call per input VBF.
+        # Hashed spectra are compared exactly again on the surviving candidates.
+        db_table = DBInvariantTable(eligible_db_list, final_invariant_list)
+        # Scalar invariants are checked before the O(k) ODDS/ODWS dict comparisons.
+        ordered_compare_keys = sorted(final_invariant_list, key=lambda key: key in _SPECTRUM_KEYS)
+        other_keys = [key for key in ordered_compare_keys
+                      if key not in db_table.column_keys or key in _SPECTRUM_KEYS]
+
+        # With several inputs to search, hash the DB columns once so each lookup is O(1);
+        # a single search is cheaper as one batch scan.
+        full_search_count = len({input_signatures[idx] for idx, vbf_dict in enumerate(input_vbf_list)
+                                 if not vbf_dict.get("no_more_matches") and not vbf_dict.get("matches")})
+        if full_search_count > 1:
+            db_table.build_lookup()
+
+        for (idx_value, _), invariants in zip(concurrency_tasks, updated_invariants):
+            updated_invariants_map[idx_value] = invariants
+
+    # Merge concurrency results; duplicates keep their own citation.
+    for idx_list in signature_indices.values():
+        invariants = updated_invariants_map.get(idx_list[0])
+        if invariants is not None:
+            merge_group_invariants(input_vbf_list, idx_list, invariants)
 
     # For each input VBF: first-time full search or narrow existing matches.
+    fresh_matches_by_signature: Dict[tuple, List[Dict[str, Any]]] = {}
     for vbf_index, input_vbf_dict in enumerate(input_vbf_list):
         if input_vbf_dict.get("no_more_matches") is True:
             continue
@@ -99,31 +160,38 @@ def compare_cli(user_requested_key: str, max_threads: int | None) -> None:
         input_invariants = input_vbf_dict.get("invariants", {})
 
         if not existing_matches:
-            # Full database search (if no matches exist yet).
-            fresh_matches = []
-            for db_object in db_vbf_list:
-                if db_object.field_n != input_vbf_dict["field_n"]:
-                    continue
-
-                db_invariants = db_object.invariants
-                if _compare_vbf_invariants(input_invariants, db_invariants, final_invariant_list):
-                    fresh_matches.append({
-                        "poly": db_object.representation.univariate_polynomial,
-                        "field_n": db_object.field_n,
-                        "irr_poly": db_object.irr_poly,
-                        "invariants": db_object.invariants,
-                        "compare_types": list(final_invariant_list),
-                    })
+            signature = input_signatures[vbf_index]
+            if signature in fresh_matches_by_signature:
+                # A duplicate of an input searched above; reuse its matches.
+                fresh_matches = [dict(match_item) for match_item in fresh_matches_by_signature[signature]]
+            else:
+                # Full database search (if no matches exist yet).
+                fresh_matches_map: Dict[tuple, Dict[str, Any]] = {}
+                for db_object in db_table.candidates(input_invariants):
+                    db_invariants = db_object.invariants
+                    if _compare_vbf_invariants(input_invariants, db_invariants, other_keys):
+                        match_item = {
+                            "poly": db_object.representation.univariate_polynomial,
+                            "field_n": db_object.field_n,
+                            "irr_poly": db_object.irr_poly,
+                            "invariants": db_object.invariants,
+                            "compare_types": list(final_invariant_list),
+                        }
+                        fresh_matches_map.setdefault(_match_key(match_item), match_item)
+
+                fresh_matches = list(fresh_matches_map.values())
+                fresh_matches_by_signature[signature] = fresh_matches
 
             input_vbf_dict["matches"] = fresh_matches
             if not fresh_matches:
                 input_vbf_dict["no_more_matches"] = True
         else:
-            # Narrow existing matches.
+            # Narrow existing matches (keyed, so duplicates stored by older runs collapse).
+            existing_matches_map = {_match_key(match_item): match_item for match_item in existing_matches}
             narrowed_list = []
-            for match_item in existing_matches:
+            for match_item in existing_matches_map.values():
                 db_invariants = match_item.get("invariants", {})
-                if _compare_vbf_invariants(input_invariants, db_invariants, final_invariant_list):
+                if _compare_vbf_invariants(input_invariants, db_invariants, ordered_compare_keys):
                     old_types = match_item.get("compare_types", [])
                     new_types = set(old_types).union(final_invariant_list)
                     match_item["compare_types"] = list(new_types)
@@ -135,64 +203,275 @@ def compare_cli(user_requested_key: str, max_threads: int | None) -> None:
 
     # Save results and print summary.
     save_input_vbfs_and_matches(input_vbf_list)
+    summary_lines = []
     for idx, final_item in enumerate(input_vbf_list):
         match_count = len(final_item.get("matches", []))
-        click.echo(f"For INPUT VBF {idx}, found {match_count} matches "
-                   f"after comparing by '{user_requested_key}'.")
-    click.echo("Done compare.")
+        summary_lines.append(f"For INPUT VBF {idx}, found {match_count} matches "
+                             f"after comparing by '{user_requested_key}'.")
+    summary_lines.append("Done compare.")
+    click.echo("\n".join(summary_lines))
+
+
+def _match_key(match_dict: Dict[str, Any]) -> tuple:
+    # Identifies a matched VBF independently of the invariants it was matched on.
+    poly_key = tuple(tuple(term) for term in match_dict.get("poly", []))
+    return (poly_key, match_dict.get("field_n"), match_dict.get("irr_poly"))
+
+
+def _missing_invariants(vbf_dict: Dict[str, Any], invariant_keys: List[str]) -> bool:
+    present_invariants = vbf_dict.get("invariants", {})
+    return any(key not in present_invariants for key in invariant_keys)
+
+
+# Stands in for an invariant missing from a dict in _compare_vbf_invariants.
+_MISSING_INVARIANT = object()
 
 
 def _compare_vbf_invariants(input_invariant: Dict[str, Any], db_invariant: Dict[str, Any], 
                             needed_keys: List[str]) -> bool:
-    # Compare the chosen invariants.
-    def _try_int(x):
-        try:
-            return int(x)
-        except:
-            return x
-
-    def _parse_spectrum(value):
-        if value == "non-quadratic":
-            return "non-quadratic"
-        if isinstance(value, dict):
-            return {int(key): int(val) for key, val in value.items()}
-        if isinstance(value, str) and value.startswith("{"):
-            try:
-                parsed = json.loads(value)
-                if isinstance(parsed, dict):
-                    return {int(key): int(val) for key, val in parsed.items()}
-                return parsed
-            except:
-                return value
-        return value
-
+    # Compare the chosen invariants. Both sides are normally loaded in normalized form (int-keyed
+    # ODDS/ODWS dicts, int ranks), so plain equality settles most pairs; values from older or
+    # hand-edited input files (string-typed ints, JSON-encoded spectra) are normalized first.
     for key in needed_keys:
-        if key not in input_invariant or key not in db_invariant:
+        # One lookup per side; a missing invariant never matches.
+        input_value = input_invariant.get(key, _MISSING_INVARIANT)
+        db_value = db_invariant.get(key, _MISSING_INVARIANT)
+        if input_value is _MISSING_INVARIANT or db_value is _MISSING_INVARIANT:
+            return False
+        if input_value != db_value and _normalized_invariant(key, input_value) != _normalized_invariant(key, db_value):
             return False
-        input_value = input_invariant[key]
-        db_value = db_invariant[key]
 
-        # Special handling for ODDS/ODWS.
-        if key in ("odds", "odws"):
-            if _parse_spectrum(input_value) != _parse_spectrum(db_value):
-                return False
-        else:
-            if _try_int(input_value) != _try_int(db_value):
-                return False 
-    
     return True
 
 
-def _ensure_invariants_for_input_vbf(task: Tuple[int, Dict[str, Any], List[str]]) -> Dict[str, Any]:
-    index_value, vbf_dictionary, invariant_keys_needed = task
+def _normalized_invariant(key: str, value: Any) -> Any:
+    if key in _SPECTRUM_KEYS:
+        return parse_spectrum(value)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _is_integer_invariant(value: Any) -> bool:
+    return isinstance(value, (int, np.integer))
+
+
+_SPECTRUM_KEYS = ("odds", "odws")
+_NON_QUADRATIC_HASH = -1
+_UINT64_MASK = 0xFFFFFFFFFFFFFFFF
 
+
+def _splitmix64(value: int) -> int:
+    value = (value + 0x9E3779B97F4A7C15) & _UINT64_MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _UINT64_MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _UINT64_MASK
+    return value ^ (value >> 31)
+
+
+def _spectrum_hash(spectrum: Any) -> int | None:
+    # Order-independent hash of an ODDS/ODWS dict, the same in every process and run.
+    # The result fits an int64 column; None means the value cannot be hashed.
+    if isinstance(spectrum, str):
+        if spectrum == "non-quadratic":
+            return _NON_QUADRATIC_HASH
+        spectrum = parse_spectrum(spectrum)
+    if not isinstance(spectrum, dict):
+        return None
+
+    spectrum_hash = 0
     try:
-        vbf_object = build_vbf_from_dict(vbf_dictionary)
-        for key in invariant_keys_needed:
+        for key, val in spectrum.items():
+            spectrum_hash ^= _splitmix64(((int(key) & 0xFFFFFFFF) << 32) | (int(val) & 0xFFFFFFFF))
+    except (ValueError, TypeError):
+        return None
+    return spectrum_hash >> 1
+
+
+def _invariant_column_value(key: str, value: Any) -> int | None:
+    if key in _SPECTRUM_KEYS:
+        return _spectrum_hash(value)
+    if _is_integer_invariant(value):
+        return int(value)
+    return None
+
+
+class DBInvariantTable:
+    """
+    Column (struct-of-arrays) view of the eligible database VBFs: one row per integer-valued
+    invariant or ODDS/ODWS hash, one column per VBF in db_vbf_list. The rows share the
+    narrowest integer dtype holding every value (int64 once a spectrum hash is included).
+    """
+    def __init__(self, db_vbf_list: List[VBF], invariant_keys: List[str]):
+        self.db_vbf_list = db_vbf_list
+        self.column_keys, self.db_columns = _build_db_invariant_columns(db_vbf_list, invariant_keys)
+        self._lookup: Dict[tuple, List[int]] | None = None
+
+    def build_lookup(self) -> None:
+        # Hash index over the columns, worth it when several inputs are searched.
+        self._lookup = _build_db_invariant_index(self.db_columns)
+
+    def candidates(self, input_invariants: Dict[str, Any]) -> List[VBF]:
+        # Database VBFs whose column invariants all equal the input's.
+        input_values = _build_input_invariant_values(input_invariants, self.column_keys)
+        if input_values is None or not _fits_dtype(input_values, self.db_columns.dtype):
+            return []
+        if self._lookup is not None:
+            candidate_indices = self._lookup.get(tuple(input_values.tolist()), [])
+        else:
+            candidate_indices = _find_candidate_indices(input_values.astype(self.db_columns.dtype),
+                                                        self.db_columns)
+        return [self.db_vbf_list[db_index] for db_index in candidate_indices]
+
+
+def _build_db_invariant_columns(db_vbf_list: List[Any], invariant_keys: List[str]) -> Tuple[List[str], np.ndarray]:
+    # One row per integer-valued (or hashed spectrum) invariant, one column per database VBF.
+    column_keys = []
+    column_rows = []
+    for key in invariant_keys:
+        row_values = [_invariant_column_value(key, db_vbf.invariants[key]) for db_vbf in db_vbf_list]
+        if None not in row_values:
+            column_keys.append(key)
+            column_rows.append(row_values)
+
+    # Most discriminating invariant first, so the per-VBF scan rejects on its first comparison
+    # as often as possible (e.g. ODDS hashes before is_quadratic).
+    if column_keys:
+        ordered_rows = sorted(zip(column_keys, column_rows), key=lambda item: -len(set(item[1])))
+        column_keys = [key for key, _ in ordered_rows]
+        column_rows = [row_values for _, row_values in ordered_rows]
+
+    db_columns = np.empty((len(column_keys), len(db_vbf_list)), dtype=_narrowest_int_dtype(column_rows))
+    for row_index, row_values in enumerate(column_rows):
+        db_columns[row_index] = row_values
+
+    return column_keys, db_columns
+
+
+def _narrowest_int_dtype(column_rows: List[List[int]]) -> type:
+    # Ranks and the differential uniformity fit int8/int16, so scans over them move far fewer bytes.
+    if not column_rows or not column_rows[0]:
+        return np.int64
+    lowest = min(min(row_values) for row_values in column_rows)
+    highest = max(max(row_values) for row_values in column_rows)
+    for dtype in (np.int8, np.int16, np.int32):
+        dtype_info = np.iinfo(dtype)
+        if dtype_info.min <= lowest and highest <= dtype_info.max:
+            return dtype
+    return np.int64
+
+
+def _fits_dtype(input_values: np.ndarray, dtype: np.dtype) -> bool:
+    # An input value outside the column dtype cannot equal any stored value (and must not wrap).
+    if input_values.size == 0:
+        return True
+    dtype_info = np.iinfo(dtype)
+    return bool(dtype_info.min <= input_values.min() and input_values.max() <= dtype_info.max)
+
+
+def _build_db_invariant_index(db_columns: np.ndarray) -> Dict[tuple, List[int]]:
+    # Maps each distinct column tuple to the positions of the database VBFs carrying it.
+    db_index: Dict[tuple, List[int]] = defaultdict(list)
+    for db_position, column_values in enumerate(db_columns.T.tolist()):
+        db_index[tuple(column_values)].append(db_position)
+    return db_index
+
+
+def _build_input_invariant_values(input_invariants: Dict[str, Any], column_keys: List[str]) -> np.ndarray | None:
+    # Returns None if the input VBF cannot match on the column invariants.
+    input_values = np.empty(len(column_keys), dtype=np.int64)
+    for row_index, key in enumerate(column_keys):
+        try:
+            if key in _SPECTRUM_KEYS:
+                column_value = _spectrum_hash(input_invariants[key])
+                if column_value is None:
+                    return None
+            else:
+                column_value = int(input_invariants[key])
+            input_values[row_index] = column_value
+        except (KeyError, TypeError, ValueError):
+            return None
+    return input_values
+
+
+def _find_matching_db_indices_numpy(input_values: np.ndarray, db_columns: np.ndarray) -> np.ndarray:
+    # Indices of the database VBFs whose integer-valued invariants all equal the input values.
+    return np.flatnonzero((db_columns == input_values[:, None]).all(axis=0))
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _find_matching_db_indices(input_values: np.ndarray, db_columns: np.ndarray) -> np.ndarray:
+        # Same result as _find_matching_db_indices_numpy, but each VBF stops at its first
+        # differing invariant and the scan runs on all cores.
+        key_count, db_count = db_columns.shape
+        matched = np.ones(db_count, dtype=np.bool_)
+        for db_index in prange(db_count):
+            for key_index in range(key_count):
+                if db_columns[key_index, db_index] != input_values[key_index]:
+                    matched[db_index] = False
+                    break
+        return np.flatnonzero(matched)
+else:
+    _find_matching_db_indices = _find_matching_db_indices_numpy
+
+
+def _find_candidate_indices(input_values: np.ndarray, db_columns: np.ndarray) -> np.ndarray:
+    # Prefer the C batch compare for int64 columns; narrower columns and older shared
+    # libraries without it use the Numba scan.
+    if HAS_COMPARE_BATCH and db_columns.dtype == np.int64:
+        return np.flatnonzero(vbf_compare_batch(input_values, db_columns))
+    return _find_matching_db_indices(input_values, db_columns)
+
+
+def _build_vbf_for_worker(vbf_dictionary: Dict[str, Any]) -> VBF:
+    # Inputs with a cached truth table skip the polynomial evaluation and field check.
+    cached_tt = cached_tt_list(vbf_dictionary)
+    if not cached_tt:
+        return build_vbf_from_dict(vbf_dictionary)
+
+    vbf_object = VBF.from_cached_tt_fast(cached_tt, vbf_dictionary.get("field_n", 0),
+                                         vbf_dictionary.get("irr_poly", ""), vbf_dictionary.get("poly", []))
+    vbf_object.invariants = vbf_dictionary.get("invariants", {})
+    return vbf_object
+
+
+def _init_compare_worker(invariant_keys_needed: Tuple[str, ...]) -> None:
+    # Runs once per worker process, so the tasks only carry the index and the VBF dict.
+    global _WORKER_INVARIANT_DISPATCH
+    invariant_functions = _all_invariant_functions()
+    _WORKER_INVARIANT_DISPATCH = tuple((key, invariant_functions[key]) for key in invariant_keys_needed
+                                       if key in invariant_functions)
+
+
+def _ensure_invariants_for_input_vbf(task: Tuple[int, Dict[str, Any]]) -> Dict[str, Any]:
+    # Returns only the invariants; the parent keeps the rest of the input VBF dict.
+    index_value, vbf_dictionary = task
+    invariant_dispatch = _WORKER_INVARIANT_DISPATCH
+
+    try:
+        vbf_object = _build_vbf_for_worker(vbf_dictionary)
+
+        # ODDS and ODWS both depend on is_quadratic, so run the ANF check once up front.
+        needs_spectra = any(key in _SPECTRUM_KEYS and key not in vbf_object.invariants
+                            for key, _ in invariant_dispatch)
+        is_quadratic = None
+        if needs_spectra:
+            if "is_quadratic" not in vbf_object.invariants:
+                # Guarded like the spectra's own _ensure_quadratic_flag: if the check fails, the
+                # spectra fall back to "non-quadratic" and the other invariants are still computed.
+                try:
+                    _all_invariant_functions()["is_quadratic"](vbf_object)
+                except Exception:
+                    pass
+            is_quadratic = bool(vbf_object.invariants.get("is_quadratic", False))
+
+        for key, aggregator_function in invariant_dispatch:
             if key not in vbf_object.invariants:
-                aggregator_function = _ALL_INVARIANT_FUNCTIONS.get(key)
-                if aggregator_function:
-                    aggregator_function(vbf_object)
+                if key in _SPECTRUM_KEYS and is_quadratic is False:
+                    vbf_object.invariants[key] = "non-quadratic"
+                    continue
+                aggregator_function(vbf_object)
 
         # If success: store the updated invariants.
         vbf_dictionary["invariants"] = vbf_object.invariants
@@ -200,4 +479,4 @@ def _ensure_invariants_for_input_vbf(task: Tuple[int, Dict[str, Any], List[str]]
     except Exception as error:
         print(f"[ERROR in worker] index={index_value}, error={error}")
 
-    return vbf_dictionary
\ No newline at end of file
+    return vbf_dictionary.get("invariants", {})
\ No newline at end of file
@@ -5,9 +5,13 @@ from storage.json_storage_utils import (
     load_input_vbfs_and_matches,
     save_input_vbfs_and_matches
 )
-from cli_commands.cli_utils import format_generic_vbf, build_vbf_from_dict
-from invariants import compute_all_invariants
-from vbf_object import VBF
+from cli_commands.cli_utils import (
+    format_generic_vbf_from_dict, build_vbf_from_dict, indices_by_signature, merge_group_invariants, vbf_task_payload
+)
+from cli_commands.worker_pool import map_chunksize, progress_step
+from invariants import ALL_INVARIANT_KEYS, compute_all_invariants, has_all_invariants
+
+_SEPARATOR = "-" * 100
 
 
 @click.command("compute-input-invariants")
@@ -15,7 +19,9 @@ from vbf_object import VBF
               help="Index of a single input VBF to process.")
 @click.option("--max-threads", "max_threads", default=None, type=int,
               help="Limit the number of parallel processes used. Default uses all available cores.")
-def compute_input_invariants_cli(input_vbf_index, max_threads):
+@click.option("--force", is_flag=True, default=False,
+              help="Recompute the invariants even for VBFs that already have all of them.")
+def compute_input_invariants_cli(input_vbf_index, max_threads, force):
     # Computes all invariants for the input VBFs (not their matches).
     vbf_list = load_input_vbfs_and_matches()
     if not vbf_list:
@@ -26,67 +32,71 @@ def compute_input_invariants_cli(input_vbf_index, max_threads):
         if input_vbf_index < 0 or input_vbf_index >= len(vbf_list):
             click.echo(f"Invalid input VBF index: {input_vbf_index}.")
             return
-        tasks = [(input_vbf_index, vbf_list[input_vbf_index])]
+        selected_indices = [input_vbf_index]
     else:
-        tasks = [(vbf_index, vbf_dict) for vbf_index, vbf_dict in enumerate(vbf_list)]
+        selected_indices = list(range(len(vbf_list)))
+
+    # VBFs that already have every invariant are skipped, unless --force drops the computed ones.
+    # Identical VBFs are computed once; the results are copied to the duplicates.
+    signature_indices = indices_by_signature(vbf_list, [
+        vbf_index for vbf_index in selected_indices
+        if force or not has_all_invariants(vbf_list[vbf_index].get("invariants", {}))])
+
+    tasks = []
+    for idx_list in signature_indices.values():
+        payload = vbf_task_payload(vbf_list[idx_list[0]])
+        if force:
+            payload["invariants"] = {key: value for key, value in payload.get("invariants", {}).items()
+                                     if key not in ALL_INVARIANT_KEYS}
+        tasks.append((idx_list[0], payload))
 
     max_workers = max_threads or None
     result_map = {}
 
     with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        future_list = [executor.submit(_compute_invariants_for_one_vbf, task_item) for task_item in tasks]
+        chunk_size = map_chunksize(len(tasks), max_workers)
 
-        # Show status for each completed job.
-        total_count = len(future_list)
+        # Show status for the completed jobs (about every 1%).
+        total_count = len(tasks)
+        report_step = progress_step(total_count)
         completed_count = 0
 
-        for future in concurrent.futures.as_completed(future_list):
+        for vbf_idx, invariants in executor.map(_compute_invariants_for_one_vbf, tasks, chunksize=chunk_size):
             completed_count += 1
-            click.echo(f"Completed job {completed_count} of {total_count}.")
-            vbf_idx, updated_dict = future.result()
-            result_map[vbf_idx] = updated_dict
+            if completed_count % report_step == 0 or completed_count == total_count:
+                click.echo(f"Completed job {completed_count} of {total_count}.")
+            result_map[vbf_idx] = invariants
 
     # Merge results into the main VBF list.
-    for vbf_index in range(len(vbf_list)):
-        if vbf_index in result_map and result_map[vbf_index] is not None:
-            vbf_list[vbf_index] = result_map[vbf_index]
+    for idx_list in signature_indices.values():
+        invariants = result_map.get(idx_list[0])
+        if invariants is not None:
+            merge_group_invariants(vbf_list, idx_list, invariants)
 
     save_input_vbfs_and_matches(vbf_list)
 
     if input_vbf_index is not None:
         updated_dict = vbf_list[input_vbf_index]
-        show_vbf = build_vbf_from_dict(updated_dict)
-        click.echo(format_generic_vbf(show_vbf, f"INPUT VBF {input_vbf_index}"))
-        click.echo("-" * 100)
+        click.echo(format_generic_vbf_from_dict(updated_dict, f"INPUT VBF {input_vbf_index}"))
+        click.echo(_SEPARATOR)
         click.echo(f"Finished computing all invariants for INPUT VBF {input_vbf_index}.")
     else:
+        # One echo for the whole listing instead of one per line.
+        output_lines = []
         for idx, item in enumerate(vbf_list):
-            show_vbf = build_vbf_from_dict(item)
-            click.echo(format_generic_vbf(show_vbf, f"INPUT VBF {idx}"))
-            click.echo("-" * 100)
-        click.echo("Finished computing all invariants for all input VBFs.")
+            output_lines.append(format_generic_vbf_from_dict(item, f"INPUT VBF {idx}"))
+            output_lines.append(_SEPARATOR)
+        output_lines.append("Finished computing all invariants for all input VBFs.")
+        click.echo("\n".join(output_lines))
 
 
 def _compute_invariants_for_one_vbf(task: Tuple[int, Dict[str, Any]]) -> Tuple[int, Dict[str, Any]]:
+    # Returns the VBF index and its invariants; the parent keeps the rest of the VBF dict.
     vbf_idx, vbf_dict = task
 
-    # Build polynomial-based if poly != [], otherwise from_cached_tt.
-    poly_data = vbf_dict.get("poly", [])
-    cached_tt = vbf_dict.get("cached_tt", [])
-
-    if poly_data:
-        vbf_object = VBF(poly_data, vbf_dict["field_n"], vbf_dict["irr_poly"])
-        if cached_tt:
-            vbf_object._cached_tt_list = cached_tt
-    elif cached_tt:
-        vbf_object = VBF.from_cached_tt(cached_tt, vbf_dict["field_n"], vbf_dict["irr_poly"])
-    else:
-        vbf_object = VBF([], vbf_dict["field_n"], vbf_dict["irr_poly"])
-
-    # Merge existing invariants.
-    vbf_object.invariants = vbf_dict.get("invariants", {})
+    # Build polynomial-based if poly != [], otherwise from_cached_tt; merges existing invariants.
+    vbf_object = build_vbf_from_dict(vbf_dict)
 
     compute_all_invariants(vbf_object)
 
-    vbf_dict["invariants"] = vbf_object.invariants
-    return (vbf_idx, vbf_dict)
\ No newline at end of file
+    return (vbf_idx, vbf_object.invariants)
\ No newline at end of file
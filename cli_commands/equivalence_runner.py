@@ -1,74 +1,145 @@
 from __future__ import annotations
 import concurrent.futures
 from collections import defaultdict
+import numpy as np
 from typing import Any, Dict, List, Tuple
 from cli_commands.cli_utils import polynomial_to_str
+from cli_commands.worker_pool import map_chunksize
 from storage.json_storage_utils import load_equivalence_list, save_equivalence_list
 from registry import REG
 
 
-def _equivalence_worker(task_data: Tuple[int, int, Any, Any, str]) -> Tuple[int, int, bool | None]:
+# Encoding of a worker result in the int8 result array.
+_RESULT_CODES = {True: 1, False: 0, None: -1}
+
+# Set in each worker by _init_equivalence_worker; one equivalence algorithm per run, so the
+# registry lookup and the instance are made once per process instead of once per match.
+_WORKER_EQ_KEY: str = ""
+_WORKER_EQUIVALENCE: Any = None
+
+
+def _init_equivalence_worker(eq_key: str) -> None:
+    global _WORKER_EQ_KEY, _WORKER_EQUIVALENCE
+    _WORKER_EQ_KEY = eq_key
+    _WORKER_EQUIVALENCE = REG.get("equivalence", eq_key)()
+
+
+def _equivalence_worker(task_data: Tuple[int, int, Any, Any]) -> Tuple[int, int, bool | None]:
     """
-    The concurrency worker function, receives: (vbf_index, match_index, object_F, object_G, eq_key).
+    The concurrency worker function, receives: (vbf_index, match_index, object_F, object_G).
     Returns: (vbf_index, match_index, bool or None).
     """
-    vbf_index, match_index, object_F, object_G, eq_key = task_data
+    vbf_index, match_index, object_F, object_G = task_data
     try:
-        eq_class = REG.get("equivalence", eq_key)
-        result_bool = eq_class().are_equivalent(object_F, object_G)
+        result_bool = _WORKER_EQUIVALENCE.are_equivalent(object_F, object_G)
         return vbf_index, match_index, bool(result_bool)
     except Exception as exc:
-        print(f"[equiv-worker] {eq_key} failed:", exc)
+        print(f"[equiv-worker] {_WORKER_EQ_KEY} failed:", exc)
         return vbf_index, match_index, None
 
 
+def _equivalence_batch_worker(batch_data: Tuple[int, Any, List[Tuple[int, Any]]]) -> List[Tuple[int, int, bool | None]]:
+    """
+    Receives: (vbf_index, object_F, [(match_index, object_G), ...]) for one input VBF.
+    Returns: a (vbf_index, match_index, bool or None) per checked match. Stops after the first
+    equivalent match, since the input VBF is then removed and the other results are not used.
+    """
+    vbf_index, object_F, match_batch = batch_data
+    batch_results = []
+    for match_index, object_G in match_batch:
+        batch_results.append(_equivalence_worker((vbf_index, match_index, object_F, object_G)))
+        if batch_results[-1][2] is True:
+            break
+    return batch_results
+
+
 def run_equivalence_on_matches(*,input_vbf_list: List[Dict[str, Any]], concurrency_tasks: List[Tuple[int, int, Any]], 
                                eq_key: str, max_workers: int | None = None) -> List[Dict[str, Any]]:
     # Runs concurrency-based equivalence checks (CCZ, 3to1, etc.) for a single equivalence algorithm.
     if not concurrency_tasks:
         return input_vbf_list
 
-    # Wrap each concurrency task with eq_key so the worker can fetch the right class.
-    packaged_tasks = []
+    # Group the matches of each input VBF into batches, so a job pickles its object_F once and
+    # one IPC round trip covers several matches. The workers get eq_key from their initializer.
+    matches_by_vbf: Dict[int, List[Tuple[int, Any]]] = defaultdict(list)
+    object_F_by_vbf: Dict[int, Any] = {}
     for (vbf_idx, match_idx, vbfF, vbfG) in concurrency_tasks:
-        packaged_tasks.append((vbf_idx, match_idx, vbfF, vbfG, eq_key))
+        matches_by_vbf[vbf_idx].append((match_idx, vbfG))
+        object_F_by_vbf[vbf_idx] = vbfF
+
+    batch_size = map_chunksize(len(concurrency_tasks), max_workers)
+    packaged_batches = []
+    for vbf_idx, match_list in matches_by_vbf.items():
+        for batch_start in range(0, len(match_list), batch_size):
+            packaged_batches.append((vbf_idx, object_F_by_vbf[vbf_idx],
+                                     match_list[batch_start:batch_start + batch_size]))
 
     # -------------------------------------------------------------------
     # Run concurrency.
     # -------------------------------------------------------------------
-    results: List[Tuple[int, int, bool | None]] = []
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        future_map = {executor.submit(_equivalence_worker, task_item): (task_item[0], task_item[1])
-            for task_item in packaged_tasks
+    # Results go into preallocated arrays in completion order: the input VBF index, the match
+    # index and the outcome (1 = True, 0 = False, -1 = None). Every task yields at most one result.
+    task_count = len(concurrency_tasks)
+    result_vbf_indices = np.empty(task_count, dtype=np.int64)
+    result_match_indices = np.empty(task_count, dtype=np.int64)
+    result_values = np.empty(task_count, dtype=np.int8)
+    result_count = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=_init_equivalence_worker,
+                                                initargs=(eq_key,)) as executor:
+        future_map = {executor.submit(_equivalence_batch_worker, batch_item): batch_item
+            for batch_item in packaged_batches
         }
+        futures_by_vbf: Dict[int, List[concurrent.futures.Future]] = defaultdict(list)
+        for future_item, batch_item in future_map.items():
+            futures_by_vbf[batch_item[0]].append(future_item)
+
         for done_future in concurrent.futures.as_completed(future_map):
-            input_vbf_idx, match_vbf_idx = future_map[done_future]
+            if done_future.cancelled():
+                continue
+            input_vbf_idx, _, match_batch = future_map[done_future]
             try:
-                _, _, worker_result = done_future.result()  # True / False / None.
+                batch_results = done_future.result()  # True / False / None per match.
             except Exception:
-                worker_result = None
-            results.append((input_vbf_idx, match_vbf_idx, worker_result))
-
-    # Organize concurrency results by input VBF index.
-    equivalence_map: Dict[int, List[Tuple[int, bool | None]]] = defaultdict(list)
-    for (vbf_i, match_i, eq_val) in results:
-        equivalence_map[vbf_i].append((match_i, eq_val))
-
-    remove_entire_vbfs: set[int] = set()
-    inequivalent_matches_map: Dict[int, List[int]] = defaultdict(list)
-
-    # For each APN that has a True match we remove the entire APN from the list.
-    for single_vbf_index, pair_list in equivalence_map.items():
-        any_equivalent = [m_idx for (m_idx, val) in pair_list if val is True]
-        if any_equivalent:
-            # Record the first True match in equivalence_list.json.
-            _store_equivalence_record(input_vbf_list[single_vbf_index],
-                input_vbf_list[single_vbf_index]["matches"][any_equivalent[0]], eq_key)
-            remove_entire_vbfs.add(single_vbf_index)
-        else:
-            # If none are True, we only remove those that are definitively False.
-            inequivalent = [m_idx for (m_idx, val) in pair_list if val is False]
-            inequivalent_matches_map[single_vbf_index] = inequivalent
+                batch_results = [(input_vbf_idx, match_vbf_idx, None) for match_vbf_idx, _ in match_batch]
+            batch_end = result_count + len(batch_results)
+            result_vbf_indices[result_count:batch_end] = [vbf_i for (vbf_i, _, _) in batch_results]
+            result_match_indices[result_count:batch_end] = [match_i for (_, match_i, _) in batch_results]
+            result_values[result_count:batch_end] = [_RESULT_CODES[eq_val] for (_, _, eq_val) in batch_results]
+            result_count = batch_end
+
+            # The input VBF is removed once one match is equivalent, so its batches that
+            # have not started yet are not needed.
+            if any(eq_val is True for (_, _, eq_val) in batch_results):
+                for sibling_future in futures_by_vbf[input_vbf_idx]:
+                    sibling_future.cancel()
+
+    result_vbf_indices = result_vbf_indices[:result_count]
+    result_match_indices = result_match_indices[:result_count]
+    result_values = result_values[:result_count]
+
+    # For each APN that has a True match we remove the entire APN from the list, and record its
+    # first True match (in completion order) for equivalence_list.json.
+    true_positions = np.flatnonzero(result_values == 1)
+    equivalent_vbfs, first_true = np.unique(result_vbf_indices[true_positions], return_index=True)
+    remove_entire_vbfs = set(equivalent_vbfs.tolist())
+    equivalence_records: List[Dict[str, Any]] = []
+    for single_vbf_index, match_index in zip(equivalent_vbfs.tolist(),
+                                             result_match_indices[true_positions[first_true]].tolist()):
+        equivalence_records.append(_equivalence_record(input_vbf_list[single_vbf_index],
+            input_vbf_list[single_vbf_index]["matches"][match_index], eq_key))
+
+    # If none are True, we only remove those that are definitively False.
+    false_positions = np.flatnonzero((result_values == 0) & ~np.isin(result_vbf_indices, equivalent_vbfs))
+    false_positions = false_positions[np.argsort(result_vbf_indices[false_positions], kind="stable")]
+    inequivalent_vbfs, group_starts = np.unique(result_vbf_indices[false_positions], return_index=True)
+    inequivalent_matches_map: Dict[int, np.ndarray] = dict(zip(
+        inequivalent_vbfs.tolist(), np.split(result_match_indices[false_positions], group_starts[1:])))
+
+    # One read and write of equivalence_list.json for the whole run.
+    if equivalence_records:
+        equivalence_list = load_equivalence_list()
+        equivalence_list.extend(equivalence_records)
+        save_equivalence_list(equivalence_list)
 
     # Build a new list of VBFs, excluding those that are removed.
     filtered_vbf_list: List[Dict[str, Any]] = []
@@ -76,13 +147,14 @@ def run_equivalence_on_matches(*,input_vbf_list: List[Dict[str, Any]], concurren
         if idx in remove_entire_vbfs:
             continue
 
-        inequivalent_for_this_vbf = set(inequivalent_matches_map.get(idx, []))
         old_matches = vbf_dictionary.get("matches", [])
-        new_matches = [
-            match_dict
-            for match_idx, match_dict in enumerate(old_matches)
-            if match_idx not in inequivalent_for_this_vbf
-        ]
+        inequivalent_for_this_vbf = inequivalent_matches_map.get(idx)
+        if inequivalent_for_this_vbf is not None:
+            keep_mask = np.ones(len(old_matches), dtype=bool)
+            keep_mask[inequivalent_for_this_vbf] = False
+            new_matches = [old_matches[match_idx] for match_idx in np.flatnonzero(keep_mask)]
+        else:
+            new_matches = old_matches
         vbf_dictionary["matches"] = new_matches
 
         # If new_matches is now empty, we set no_more_matches = True.
@@ -95,28 +167,23 @@ def run_equivalence_on_matches(*,input_vbf_list: List[Dict[str, Any]], concurren
     return filtered_vbf_list
 
 
-def _store_equivalence_record(input_vbf_dictionary: Dict[str, Any], matched_vbf_dictionary: Dict[str, Any],
-                              eq_type_string: str) -> None:
-    # Store a record of the discovered equivalence in equivalence_list.json.
-    equivalence_list = load_equivalence_list()
-
-    equivalence_list.append(
-        {
-            "eq_type": eq_type_string,
-            "input_vbf": {
-                "poly": input_vbf_dictionary["poly"],
-                "poly_str": polynomial_to_str(input_vbf_dictionary["poly"]),
-                "field_n": input_vbf_dictionary["field_n"],
-                "irr_poly": input_vbf_dictionary["irr_poly"],
-                "invariants": input_vbf_dictionary.get("invariants", {}),
-            },
-            "matched_vbf": {
-                "poly": matched_vbf_dictionary["poly"],
-                "poly_str": polynomial_to_str(matched_vbf_dictionary["poly"]),
-                "field_n": matched_vbf_dictionary["field_n"],
-                "irr_poly": matched_vbf_dictionary["irr_poly"],
-                "invariants": matched_vbf_dictionary.get("invariants", {}),
-            },
-        }
-    )
-    save_equivalence_list(equivalence_list)
\ No newline at end of file
+def _equivalence_record(input_vbf_dictionary: Dict[str, Any], matched_vbf_dictionary: Dict[str, Any],
+                        eq_type_string: str) -> Dict[str, Any]:
+    # The record of a discovered equivalence, as stored in equivalence_list.json.
+    return {
+        "eq_type": eq_type_string,
+        "input_vbf": {
+            "poly": input_vbf_dictionary["poly"],
+            "poly_str": polynomial_to_str(input_vbf_dictionary["poly"]),
+            "field_n": input_vbf_dictionary["field_n"],
+            "irr_poly": input_vbf_dictionary["irr_poly"],
+            "invariants": input_vbf_dictionary.get("invariants", {}),
+        },
+        "matched_vbf": {
+            "poly": matched_vbf_dictionary["poly"],
+            "poly_str": polynomial_to_str(matched_vbf_dictionary["poly"]),
+            "field_n": matched_vbf_dictionary["field_n"],
+            "irr_poly": matched_vbf_dictionary["irr_poly"],
+            "invariants": matched_vbf_dictionary.get("invariants", {}),
+        },
+    }
@@ -1,10 +1,13 @@
 import click
-import json
-from typing import List
+import functools
+import numpy as np
+import pandas as pd
+from typing import Tuple
 from computations.default_polynomials import DEFAULT_IRREDUCIBLE_POLYNOMIAL
 from computations.poly_parse_utils import bitmask_to_poly_str
 from cli_commands.cli_utils import polynomial_to_str
 from storage_pandas import load_dataframe_for_dimension
+from storage.json_storage_utils import json_dumps_compact, json_loads
 
 
 @click.command("export-html")
@@ -25,61 +28,47 @@ def export_html_cli(dim_n, file_name):
     # Δ-rank and Γ-rank columns only apply for dimensions <= 9.
     rank_columns_applicable = (dim_n <= 9)
 
-    default_irreducible_poly_int = DEFAULT_IRREDUCIBLE_POLYNOMIAL.get(dim_n, 0)
-    default_irreducible_polynomial_str = (bitmask_to_poly_str(default_irreducible_poly_int)
-        if default_irreducible_poly_int else "None")
+    default_irreducible_polynomial_str = _default_irr_str(dim_n)
 
     # Use the default output filename (if not provided).
     if not file_name:
         file_name = f"vbf_{dim_n}.html"
 
-    # Build a list of row dictionaries from the DataFrame.
-    apn_entries = []
-    for index_value, data_row in apn_dataframe.iterrows():
-        local_identifier = index_value + 1
-        dimension_value = int(data_row.get("field_n", dim_n))
+    # Build a list of row dictionaries from the DataFrame. Each column is read once as a list,
+    # instead of materializing a Series per row.
+    row_count = len(apn_dataframe)
+    identifiers = [index_value + 1 for index_value in apn_dataframe.index.tolist()]
+    dimensions = _column_values(apn_dataframe, "field_n", dim_n)
+    stored_polys = _column_values(apn_dataframe, "poly", "")
+    odds_values = _spectrum_display_values(apn_dataframe, "odds")
+    odws_values = _spectrum_display_values(apn_dataframe, "odws")
 
+    # For dimensions <= 9, Δ-rank and Γ-rank.
+    if rank_columns_applicable:
+        delta_ranks = _rank_values(apn_dataframe, "delta_rank")
+        gamma_ranks = _rank_values(apn_dataframe, "gamma_rank")
+    else:
+        delta_ranks = gamma_ranks = [""] * row_count
+
+    citations = _citation_values(apn_dataframe)
+
+    apn_entries = []
+    for (local_identifier, dimension_value, stored_poly_json, odds_value, odws_value,
+         delta_rank, gamma_rank, citation_value) in zip(identifiers, dimensions, stored_polys, odds_values,
+                                                        odws_values, delta_ranks, gamma_ranks, citations):
         # Convert stored polynomial JSON into a univariate polynomial string.
-        stored_poly_json = data_row.get("poly", "")
         univariate_poly_data = []
         try:
-            univariate_poly_data = json.loads(stored_poly_json) if stored_poly_json else []
-        except:
+            univariate_poly_data = json_loads(stored_poly_json) if stored_poly_json else []
+        except (ValueError, TypeError):
+            # Invalid JSON (orjson's decode error is a ValueError too) or a non-string value.
             pass
 
         univariate_polynomial_string = polynomial_to_str(univariate_poly_data)
 
-        # ODDS
-        odds_value = data_row.get("odds", "non-quadratic")
-        if isinstance(odds_value, str) and odds_value.startswith("{"):
-            try:
-                parsed_odds = json.loads(odds_value)
-                odds_value = str(parsed_odds)
-            except:
-                pass
-
-        # ODWS
-        odws_value = data_row.get("odws", "non-quadratic")
-        if isinstance(odws_value, str) and odws_value.startswith("{"):
-            try:
-                parsed_odws = json.loads(odws_value)
-                odws_value = str(parsed_odws)
-            except:
-                pass
-
-        # For dimensions <= 9, Δ-rank and Γ-rank.
-        if rank_columns_applicable:
-            delta_rank = data_row.get("delta_rank", "")
-            gamma_rank = data_row.get("gamma_rank", "")
-        else:
-            delta_rank = ""
-            gamma_rank = ""
-
-        citation_value = data_row.get("citation", "").strip()
-
         apn_entries.append({
             "id": local_identifier,
-            "dimension": dimension_value,
+            "dimension": int(dimension_value),
             "univariate_polynomial": univariate_polynomial_string,
             "odds": odds_value,
             "odws": odws_value,
@@ -88,25 +77,92 @@ def export_html_cli(dim_n, file_name):
             "citation": citation_value,
         })
 
-    # Generate HTML content.
-    html_document_skeleton = _build_html_document(
-        apn_entries,
+    # Generate HTML content. The page is written around the serialized APN data, so the
+    # (large) data is not copied into one document string first.
+    html_before_data, html_after_data = _build_html_document(
         dim_n,
         default_irreducible_polynomial_str,
         rank_columns_applicable
     )
 
     # Write to file.
-    with open(file_name, "w", encoding="utf-8") as file_out:
-        file_out.write(html_document_skeleton)
+    with open(file_name, "wb") as file_out:
+        file_out.write(html_before_data.encode("utf-8"))
+        file_out.write(_json_dumps_bytes(apn_entries))
+        file_out.write(html_after_data.encode("utf-8"))
 
     click.echo(
         f"Exported {len(apn_entries)} APN(s) for dimension={dim_n} to '{file_name}'."
     )
 
 
-def _build_html_document(apn_entries: List[dict], field_dimension: int, 
-                         default_irreducible_polynomial_str: str, rank_columns_applicable: bool) -> str:
+@functools.lru_cache(maxsize=32)
+def _default_irr_str(dim_n: int) -> str:
+    # The default irreducible polynomial of GF(2^dim_n) as shown in the page header.
+    default_irreducible_poly_int = DEFAULT_IRREDUCIBLE_POLYNOMIAL.get(dim_n, 0)
+    return bitmask_to_poly_str(default_irreducible_poly_int) if default_irreducible_poly_int else "None"
+
+
+def _json_dumps_bytes(json_value) -> bytes:
+    # The page reads the data with JSON.parse from a script block, so "</" is escaped: a citation
+    # cannot end the block early.
+    return json_dumps_compact(json_value).replace(b"</", b"<\\/")
+
+
+def _column_values(dataframe, column_name: str, default_value) -> list:
+    # One column as a list of Python values, or default_value for every row if it is missing.
+    if column_name in dataframe.columns:
+        return dataframe[column_name].tolist()
+    return [default_value] * len(dataframe)
+
+
+def _rank_values(dataframe, column_name: str) -> list:
+    # A rank column with missing ranks shown empty; NaN is not valid in the JSON the page parses.
+    if column_name not in dataframe.columns:
+        return [""] * len(dataframe)
+    rank_column = dataframe[column_name]
+    return rank_column.astype(object).where(rank_column.notna(), "").tolist()
+
+
+def _citation_values(dataframe) -> list:
+    # The stripped citations. A few citations are shared by many APNs, so the column is made
+    # categorical and each distinct citation is stripped once; code -1 (missing) picks the last "".
+    if "citation" not in dataframe.columns:
+        return [""] * len(dataframe)
+    citation_column = dataframe["citation"].astype("category")
+    stripped_citations = [citation.strip() if isinstance(citation, str) else ""
+                          for citation in citation_column.cat.categories.tolist()]
+    return np.array(stripped_citations + [""], dtype=object)[citation_column.cat.codes.to_numpy()].tolist()
+
+
+def _spectrum_display_values(dataframe, column_name: str) -> list:
+    # The ODDS/ODWS column for display. The JSON rows are found with one vectorized startswith
+    # and only those are parsed; "non-quadratic" and other values are kept as they are.
+    spectrum_values = _column_values(dataframe, column_name, "non-quadratic")
+    if column_name not in dataframe.columns or not pd.api.types.is_string_dtype(dataframe[column_name]):
+        return [_spectrum_display_value(spectrum_value) for spectrum_value in spectrum_values]
+
+    json_mask = dataframe[column_name].str.startswith("{", na=False).to_numpy(dtype=bool)
+    for row_position in np.flatnonzero(json_mask).tolist():
+        spectrum_values[row_position] = _spectrum_display_value(spectrum_values[row_position])
+    return spectrum_values
+
+
+def _spectrum_display_value(spectrum_value):
+    # Stored ODDS/ODWS JSON strings are shown as their Python dict text.
+    if isinstance(spectrum_value, str) and spectrum_value.startswith("{"):
+        try:
+            return str(json_loads(spectrum_value))
+        except (ValueError, TypeError):
+            pass
+    return spectrum_value
+
+
+@functools.lru_cache(maxsize=32)
+def _build_html_document(field_dimension: int, default_irreducible_polynomial_str: str,
+                         rank_columns_applicable: bool) -> Tuple[str, str]:
+    # Returns the HTML before and after the place where the JSON APN data goes. The page does not
+    # depend on the data, so repeated exports of a dimension reuse the built parts.
     
     css_style_block = """
       body {
@@ -162,9 +218,6 @@ def _build_html_document(apn_entries: List[dict], field_dimension: int,
       }
     """
 
-    # Convert the apn_entries to JSON for the JavaScript code.
-    serialized_apn_data = json.dumps(apn_entries)
-
     javascript_code_block = r"""
       let allData = [];
       let currentPage = 1;
@@ -237,93 +290,116 @@ def _build_html_document(apn_entries: List[dict], field_dimension: int,
         return "View Citation";
       }
 
-      function renderTable() {
-        const tableBody = document.getElementById("table-body");
-        tableBody.innerHTML = "";
+      const htmlEscapes = {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"};
 
-        const startIndex = (currentPage - 1) * pageSize;
-        const endIndex = Math.min(startIndex + pageSize, allData.length);
-
-        for (let i = startIndex; i < endIndex; i++) {
-          const apnRow = allData[i];
-          const trElement = document.createElement("tr");
-
-          // ID (center-column)
-          let tdID = document.createElement("td");
-          tdID.className = "center-col";
-          tdID.textContent = apnRow.id;
-          trElement.appendChild(tdID);
-
-          // Dimension (center-column)
-          let tdDimension = document.createElement("td");
-          tdDimension.className = "center-col";
-          tdDimension.textContent = apnRow.dimension;
-          trElement.appendChild(tdDimension);
-
-          // Univariate Polynomial (wrap-column)
-          let tdPolynomial = document.createElement("td");
-          tdPolynomial.className = "wrap-col";
-          tdPolynomial.textContent = apnRow.univariate_polynomial;
-          trElement.appendChild(tdPolynomial);
-
-          // ODDS (wrap-column)
-          let tdODDS = document.createElement("td");
-          tdODDS.className = "wrap-col";
-          tdODDS.textContent = apnRow.odds;
-          trElement.appendChild(tdODDS);
-
-          // ODWS (wrap-column)
-          let tdODWS = document.createElement("td");
-          tdODWS.className = "wrap-col";
-          tdODWS.textContent = apnRow.odws;
-          trElement.appendChild(tdODWS);
-
-          // Δ-rank and Γ-rank columns (center-column)
-          if (__RANK_COLUMNS__) {
-            let tdDeltaRank = document.createElement("td");
-            tdDeltaRank.className = "center-col";
-            tdDeltaRank.textContent = apnRow.delta_rank;
-            trElement.appendChild(tdDeltaRank);
-
-            let tdGammaRank = document.createElement("td");
-            tdGammaRank.className = "center-col";
-            tdGammaRank.textContent = apnRow.gamma_rank;
-            trElement.appendChild(tdGammaRank);
-          }
+      function escapeHtml(value) {
+        if (value === null || value === undefined) {
+          return "";
+        }
+        return String(value).replace(/[&<>"']/g, character => htmlEscapes[character]);
+      }
 
-          // Citation (center-column)
-          let tdCitation = document.createElement("td");
-          tdCitation.className = "center-col";
-          if (apnRow.citation && apnRow.citation.trim().length > 0) {
-            let citationString = apnRow.citation.trim();
-            let citationButton = document.createElement("button");
-            citationButton.textContent = getCitationButtonLabel(citationString);
-            citationButton.onclick = () => showCitation(citationString);
-            tdCitation.appendChild(citationButton);
-          } else {
-            tdCitation.textContent = "None";
-          }
-          trElement.appendChild(tdCitation);
+      function rowHtml(i) {
+        const apnRow = allData[i];
+
+        // ID and Dimension (center-column), Univariate Polynomial, ODDS and ODWS (wrap-column)
+        let html =
+          '<tr><td class="center-col">' + escapeHtml(apnRow.id) + '</td>' +
+          '<td class="center-col">' + escapeHtml(apnRow.dimension) + '</td>' +
+          '<td class="wrap-col">' + escapeHtml(apnRow.univariate_polynomial) + '</td>' +
+          '<td class="wrap-col">' + escapeHtml(apnRow.odds) + '</td>' +
+          '<td class="wrap-col">' + escapeHtml(apnRow.odws) + '</td>';
+
+        // Δ-rank and Γ-rank columns (center-column)
+        if (__RANK_COLUMNS__) {
+          html +=
+            '<td class="center-col">' + escapeHtml(apnRow.delta_rank) + '</td>' +
+            '<td class="center-col">' + escapeHtml(apnRow.gamma_rank) + '</td>';
+        }
+
+        // Citation (center-column); the button refers to its row, see the click handler below.
+        if (apnRow.citation && apnRow.citation.trim().length > 0) {
+          html += '<td class="center-col"><button data-row="' + i + '">' +
+            escapeHtml(getCitationButtonLabel(apnRow.citation.trim())) + '</button></td></tr>';
+        } else {
+          html += '<td class="center-col">None</td></tr>';
+        }
+        return html;
+      }
+
+      // A page is rendered renderBatchSize rows at a time: more rows are appended when the end
+      // of the table comes near the viewport, so the DOM only holds the rows scrolled to so far.
+      const renderBatchSize = 50;
+      let renderedEnd = 0;
+      let pageEnd = 0;
+      let rowObserver = null;
+
+      function appendRows() {
+        const batchEnd = Math.min(renderedEnd + renderBatchSize, pageEnd);
+        const rowParts = [];
+        for (let i = renderedEnd; i < batchEnd; i++) {
+          rowParts.push(rowHtml(i));
+        }
+        document.getElementById("table-body").insertAdjacentHTML("beforeend", rowParts.join(""));
+        renderedEnd = batchEnd;
+      }
+
+      function watchTableEnd() {
+        // Observing again makes the observer report the current state, so batches keep being
+        // appended while the end of the table stays in view.
+        const tableEndElement = document.getElementById("table-end");
+        rowObserver.unobserve(tableEndElement);
+        if (renderedEnd < pageEnd) {
+          rowObserver.observe(tableEndElement);
+        }
+      }
 
-          tableBody.appendChild(trElement);
+      function renderTable() {
+        const startIndex = (currentPage - 1) * pageSize;
+        pageEnd = Math.min(startIndex + pageSize, allData.length);
+        renderedEnd = startIndex;
+        document.getElementById("table-body").innerHTML = "";
+
+        if (rowObserver) {
+          appendRows();
+          watchTableEnd();
+        } else {
+          // Without IntersectionObserver the whole page is rendered at once.
+          while (renderedEnd < pageEnd) {
+            appendRows();
+          }
         }
 
         const pageInfoElement = document.getElementById("page-info");
-        pageInfoElement.textContent = `Page ${currentPage} of ${Math.ceil(allData.length / pageSize)} (Total: ${allData.length})`;
+        const pageCount = Math.ceil(allData.length / pageSize);
+        pageInfoElement.textContent = `Page ${currentPage} of ${pageCount} (Total: ${allData.length})`;
       }
 
       document.addEventListener("DOMContentLoaded", () => {
-        let initialData = __APN_DATA__;
+        // One click handler for all citation buttons instead of one per row.
+        document.getElementById("table-body").addEventListener("click", event => {
+          const citationButton = event.target.closest("button[data-row]");
+          if (citationButton) {
+            showCitation(allData[parseInt(citationButton.dataset.row, 10)].citation.trim());
+          }
+        });
+
+        if (typeof IntersectionObserver !== "undefined") {
+          rowObserver = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+              appendRows();
+              watchTableEnd();
+            }
+          }, {rootMargin: "0px 0px 600px 0px"});
+        }
+
+        let initialData = JSON.parse(document.getElementById("apn-data").textContent);
         loadData(initialData);
       });
     """
 
     rank_columns_str = "true" if rank_columns_applicable else "false"
-    updated_javascript = (
-        javascript_code_block
-        .replace("__APN_DATA__", serialized_apn_data)
-        .replace("__RANK_COLUMNS__", rank_columns_str)
-    )
+    updated_javascript = javascript_code_block.replace("__RANK_COLUMNS__", rank_columns_str)
 
     if rank_columns_applicable:
         # If dimension <= 9 then add rank columns.
@@ -369,6 +445,7 @@ def _build_html_document(apn_entries: List[dict], field_dimension: int,
         </thead>
         <tbody id="table-body"></tbody>
       </table>
+      <div id="table-end"></div>
 
       <div class="pagination-controls">
         <button onclick="prevPage()">Prev</button>
@@ -384,6 +461,7 @@ def _build_html_document(apn_entries: List[dict], field_dimension: int,
         </div>
       </dialog>
 
+      <script type="application/json" id="apn-data">__APN_DATA__</script>
       <script>
       {updated_javascript}
       </script>
@@ -391,4 +469,5 @@ def _build_html_document(apn_entries: List[dict], field_dimension: int,
       </body>
       </html>
     """
-    return html_document_skeleton
\ No newline at end of file
+    html_before_data, html_after_data = html_document_skeleton.split("__APN_DATA__")
+    return html_before_data, html_after_data
\ No newline at end of file
@@ -1,6 +1,8 @@
 import click
-from storage.json_storage_utils import load_input_vbfs_and_matches
-from cli_commands.cli_utils import format_generic_vbf, build_vbf_from_dict
+from storage.json_storage_utils import load_input_vbf_match_counts, load_input_vbfs_and_matches
+from cli_commands.cli_utils import format_generic_vbf_from_dict
+
+_SEPARATOR = "-" * 100
 
 @click.command("print")
 @click.option("--index", "input_vbf_index", default=None, type=int,
@@ -11,59 +13,59 @@ from cli_commands.cli_utils import format_generic_vbf, build_vbf_from_dict
               help="If specified, only prints the input VBFs.")
 def print_cli(input_vbf_index, summary, input_only):
     # Print VBFs and (optionally) their matches from storage/input_vbfs_and_matches.json.
+    # The output is collected and written with one echo instead of one per line.
+    if summary:
+        # Only the match counts are needed, so the stored VBFs are not decoded.
+        match_counts = load_input_vbf_match_counts()
+        if not match_counts:
+            click.echo("No input VBFs found. Please run 'add-input' first.")
+            return
+        output_lines = ["Summary of VBFs and match counts:\n"]
+        for idx, match_count in enumerate(match_counts):
+            output_lines.append(f"  VBF #{idx}: {match_count} matches")
+        click.echo("\n".join(output_lines))
+        return
+
     vbf_dicts = load_input_vbfs_and_matches()
     if not vbf_dicts:
         click.echo("No input VBFs found. Please run 'add-input' first.")
         return
 
-    if summary:
-        click.echo("Summary of VBFs and match counts:\n")
-        for idx, vbf_dictionary in enumerate(vbf_dicts):
-            matches = vbf_dictionary.get("matches", [])
-            click.echo(f"  VBF #{idx}: {len(matches)} matches")
-        return
-
     # If no index provided, then print all VBF(s).
     if input_vbf_index is None:
-        for idx, vbf_dictionary in enumerate(vbf_dicts):
-            if input_only:
-                _print_single_vbf_only(vbf_dictionary, idx)
-            else:
-                _print_single_vbf_with_matches(vbf_dictionary, idx)
+        selected_indices = range(len(vbf_dicts))
     else:
         # If user gave the --index option, then just print that single VBF.
         if input_vbf_index < 0 or input_vbf_index >= len(vbf_dicts):
             click.echo(f"Invalid input VBF index: {input_vbf_index}.")
             return
-        vbf_dictionary = vbf_dicts[input_vbf_index]
+        selected_indices = [input_vbf_index]
+
+    output_lines = []
+    for idx in selected_indices:
         if input_only:
-            _print_single_vbf_only(vbf_dictionary, input_vbf_index)
+            output_lines.extend(_single_vbf_only_lines(vbf_dicts[idx], idx))
         else:
-            _print_single_vbf_with_matches(vbf_dictionary, input_vbf_index)
+            output_lines.extend(_single_vbf_with_matches_lines(vbf_dicts[idx], idx))
+    click.echo("\n".join(output_lines))
 
-def _print_single_vbf_only(vbf_dict, idx):
-    # Prints only the 'input' VBF object.
-    vbf_object = build_vbf_from_dict(vbf_dict)
-    click.echo(format_generic_vbf(vbf_object, f"\nINPUT VBF {idx}"))
-    click.echo("-" * 100)
+def _single_vbf_only_lines(vbf_dict, idx):
+    # The lines for only the 'input' VBF object.
+    return [format_generic_vbf_from_dict(vbf_dict, f"\nINPUT VBF {idx}"), _SEPARATOR]
 
-def _print_single_vbf_with_matches(vbf_dict, index):
-    # Prints the 'input' VBF object and then prints all matches below it.
-    input_vbf_object = build_vbf_from_dict(vbf_dict)
-
-    click.echo(format_generic_vbf(input_vbf_object, f"\nINPUT VBF {index}"))
-    click.echo("-" * 100)
+def _single_vbf_with_matches_lines(vbf_dict, index):
+    # The lines for the 'input' VBF object, followed by all matches below it.
+    output_lines = _single_vbf_only_lines(vbf_dict, index)
 
     matches = vbf_dict.get("matches", [])
-    click.echo(f"Matches found: {len(matches)}")
+    output_lines.append(f"Matches found: {len(matches)}")
     if matches:
         for idx, match_dict in enumerate(matches, start=1):
             compare_types = match_dict.get("compare_types", [])
-            matched_object = build_vbf_from_dict(match_dict)
-
-            click.echo(f"  - Matched on {compare_types} with:")
-            click.echo("-" * 100)
-            click.echo(format_generic_vbf(matched_object, f"Matched VBF #{index}.{idx}"))
-            click.echo("-" * 100)
+            output_lines.append(f"  - Matched on {compare_types} with:")
+            output_lines.append(_SEPARATOR)
+            output_lines.append(format_generic_vbf_from_dict(match_dict, f"Matched VBF #{index}.{idx}"))
+            output_lines.append(_SEPARATOR)
     else:
-        click.echo("  - No matches.")
\ No newline at end of file
+        output_lines.append("  - No matches.")
+    return output_lines
@@ -1,7 +1,9 @@
 import click
-from storage_pandas import load_objects_for_dimension_pandas
+from storage_pandas import load_dataframe_for_dimension, polynomials_from_dataframe, vbf_objects_from_dataframe
 from cli_commands.cli_utils import format_generic_vbf, polynomial_to_str
 
+_SEPARATOR = "-" * 100
+
 @click.command("read-db")
 @click.option("--dim", "dimension_n", required=True, type=int,
               help="The dimension n for GF(2^n).")
@@ -13,52 +15,56 @@ def read_db(dimension_n, vbf_range, save_to_file):
     # Loads, prints or saves (file name {dim_n}bit_db_unipoly.txt) VBFs from the database.
     click.echo(f"Loading VBFs for dimension n = {dimension_n}...")
 
-    vbf_list = load_objects_for_dimension_pandas(dimension_n)
-    if not vbf_list:
+    loaded_dataframe = load_dataframe_for_dimension(dimension_n, is_apn=True)
+    if loaded_dataframe.empty:
         click.echo(f"No VBFs found for dimension n = {dimension_n}.")
         return
 
-    click.echo(f"Total VBFs loaded for dimension n = {dimension_n}: {len(vbf_list)}\n")
+    click.echo(f"Total VBFs loaded for dimension n = {dimension_n}: {len(loaded_dataframe)}\n")
 
+    # VBF objects are only built for the rows that are printed or saved.
     # Option: --range <start> <end> for a custom range.
     if vbf_range is not None:
         start_idx, end_idx = vbf_range
-        subset = vbf_list[start_idx - 1 : end_idx]
+        subset = vbf_objects_from_dataframe(loaded_dataframe.iloc[start_idx - 1 : end_idx], dimension_n)
         if not subset:
             click.echo(f"No VBFs in the requested range {start_idx}-{end_idx}.")
             return
         start_offset = start_idx
     else:
         # By default: prints the first 5.
-        subset = vbf_list[:5]
+        subset = vbf_objects_from_dataframe(loaded_dataframe.iloc[:5], dimension_n)
         start_offset = 1
 
-    click.echo(f"VBF GF(2^{dimension_n}) Details:")
-    click.echo("-" * 100)
+    # One echo for the whole listing instead of one per line.
+    output_lines = [f"VBF GF(2^{dimension_n}) Details:", _SEPARATOR]
     for idx, vbf_object in enumerate(subset, start=start_offset):
-        click.echo(format_generic_vbf(vbf_object, f"VBF {idx}"))
-        click.echo("-" * 100)
+        output_lines.append(format_generic_vbf(vbf_object, f"VBF {idx}"))
+        output_lines.append(_SEPARATOR)
+    click.echo("\n".join(output_lines))
 
     if save_to_file:
-        if vbf_range is not None:
-            vbfs_to_export = subset
-        else:
-            # If no range, then save the entire list.
-            vbfs_to_export = vbf_list
-
         out_filename = f"{dimension_n}bit_db_unipoly.txt"
         click.echo(f"\nSaving univariate polynomials to '{out_filename}'...")
 
-        with open(out_filename, "w", encoding="utf-8") as file:
-            # First line is the field n dimension.
-            file.write(f"{dimension_n}\n")
-
-            for vbf_object in vbfs_to_export:
-                if hasattr(vbf_object.representation, "univariate_polynomial"):
-                    poly_str = polynomial_to_str(vbf_object.representation.univariate_polynomial)
-                    file.write(poly_str + "\n")
+        # First line is the field n dimension. The lines are written with one call.
+        output_lines = [str(dimension_n)]
+        if vbf_range is not None:
+            for vbf_object in subset:
+                # One getattr instead of a hasattr check followed by the attribute lookup.
+                univariate_polynomial = getattr(vbf_object.representation, "univariate_polynomial", None)
+                if univariate_polynomial is not None:
+                    output_lines.append(polynomial_to_str(univariate_polynomial))
                 else:
                     # In case a VBF has no univariate polynomial we fallback.
-                    file.write("0\n")
+                    output_lines.append("0")
+        else:
+            # If no range, then save the entire list. Only the stored polynomials are needed, so
+            # they are read from the poly column without building VBF objects.
+            for polynomial_data in polynomials_from_dataframe(loaded_dataframe):
+                output_lines.append(polynomial_to_str(polynomial_data))
+
+        with open(out_filename, "w", encoding="utf-8") as file:
+            file.write("\n".join(output_lines) + "\n")
 
-        click.echo(f"Saved {len(vbfs_to_export)} polynomial(s) to '{out_filename}'.")
\ No newline at end of file
+        click.echo(f"Saved {len(output_lines) - 1} polynomial(s) to '{out_filename}'.")
\ No newline at end of file
@@ -24,12 +24,15 @@ def reset_storage_cli(yes):
 
     deleted_paths = []
     for file_path in files_to_delete:
-        if file_path.is_file():
-            try:
-                file_path.unlink()  # Remove the file.
-                deleted_paths.append(file_path)
-            except Exception as exc:
-                click.echo(f"Error deleting {file_path}: {exc}", err=True)
+        # Unlink directly; a missing file is not an error (one call instead of a stat and an unlink).
+        try:
+            file_path.unlink()  # Remove the file.
+        except FileNotFoundError:
+            continue
+        except Exception as exc:
+            click.echo(f"Error deleting {file_path}: {exc}", err=True)
+            continue
+        deleted_paths.append(file_path)
 
     if deleted_paths:
         path_strings = [str(path) for path in deleted_paths]
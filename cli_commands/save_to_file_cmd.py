@@ -1,8 +1,10 @@
 import click
-import json
-from typing import List, Dict, Any
-from cli_commands.cli_utils import polynomial_to_str, build_vbf_from_dict
-from storage.json_storage_utils import load_input_vbfs_and_matches
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+from cli_commands.cli_utils import polynomial_to_str, build_vbf_from_dict, vbf_signature
+from storage.json_storage_utils import load_input_vbfs_and_matches, write_json_object_entries
+from vbf_object import VBF
 
 @click.command("save")
 @click.option("--file-name", default=None, type=str,
@@ -42,13 +44,16 @@ def save_to_file_cli(file_name, matches, poly, tt):
     # If user selected exactly one type, we can use the --file-name option.
     multiple_selections = (len(selected_modes) > 1)
 
+    # Each input VBF is built once and shared by the selected exports.
+    input_vbf_objects = [build_vbf_from_dict(vbf_dictionary) for vbf_dictionary in input_vbf_list]
+
     if "matches" in selected_modes:
         if (not multiple_selections) and (file_name is not None):
             matches_filename = file_name
         else:
             matches_filename = "matches_output.json"
 
-        _export_matches_json(input_vbf_list, matches_filename)
+        _export_matches_json(input_vbf_list, input_vbf_objects, matches_filename)
         click.echo(f"Matches saved to {matches_filename}")
 
     if "poly" in selected_modes:
@@ -57,7 +62,7 @@ def save_to_file_cli(file_name, matches, poly, tt):
         else:
             poly_filename = "poly_output.txt"
 
-        _export_poly(input_vbf_list, poly_filename)
+        _export_poly(input_vbf_objects, poly_filename)
         click.echo(f"Polynomials saved to {poly_filename}")
 
     if "tt" in selected_modes:
@@ -66,16 +71,22 @@ def save_to_file_cli(file_name, matches, poly, tt):
         else:
             tt_filename = "tt_output.txt"
 
-        _export_tt(input_vbf_list, tt_filename)
+        _export_tt(input_vbf_objects, tt_filename)
         click.echo(f"Truth tables saved to {tt_filename}")
 
 
-def _export_matches_json(input_vbf_list: List[Dict[str, Any]], output_file: str):
-    # Export the matches in JSON format.
-    output_json_data = {}
+def _export_matches_json(input_vbf_list: List[Dict[str, Any]], input_vbf_objects: List[VBF], output_file: str):
+    # Export the matches in JSON format. The entries are written one input VBF at a time, with
+    # orjson when available (the json module otherwise), as for the storage files.
+    write_json_object_entries(Path(output_file), _matches_json_entries(input_vbf_list, input_vbf_objects))
+
+
+def _matches_json_entries(input_vbf_list: List[Dict[str, Any]],
+                          input_vbf_objects: List[VBF]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    # A database VBF often matches several input VBFs; its fields are built once per export.
+    match_fields_by_signature: Dict[tuple, Dict[str, Any]] = {}
 
-    for input_index, vbf_dictionary in enumerate(input_vbf_list):
-        vbf_object = build_vbf_from_dict(vbf_dictionary)
+    for input_index, (vbf_dictionary, vbf_object) in enumerate(zip(input_vbf_list, input_vbf_objects)):
         input_poly_str = polynomial_to_str(vbf_object.representation.univariate_polynomial)
 
         input_vbf_summary = {
@@ -90,79 +101,79 @@ def _export_matches_json(input_vbf_list: List[Dict[str, Any]], output_file: str)
         output_matches_list = []
         matches_list = vbf_dictionary.get("matches", [])
         for match_dict in matches_list:
-            match_vbf_obj = build_vbf_from_dict(match_dict)
-            match_poly_str = polynomial_to_str(match_vbf_obj.representation.univariate_polynomial)
-            compare_types_value = match_dict.get("compare_types", [])
-            if isinstance(compare_types_value, set):
-                compare_types_value = list(compare_types_value)
-
+            match_signature = vbf_signature(match_dict)
+            match_fields = match_fields_by_signature.get(match_signature)
+            if match_fields is None:
+                match_vbf_obj = build_vbf_from_dict(match_dict)
+                match_fields = {
+                    "field_n": match_vbf_obj.field_n,
+                    "irr_poly": match_vbf_obj.irr_poly,
+                    "poly": match_vbf_obj.representation.univariate_polynomial,
+                    "poly_str": polynomial_to_str(match_vbf_obj.representation.univariate_polynomial),
+                }
+                match_fields_by_signature[match_signature] = match_fields
             output_matches_list.append({
-                "compare_types": compare_types_value,
-                "field_n": match_vbf_obj.field_n,
-                "irr_poly": match_vbf_obj.irr_poly,
-                "poly": match_vbf_obj.representation.univariate_polynomial,
-                "poly_str": match_poly_str,
-                "invariants": match_vbf_obj.invariants
+                # A compare_types set is written as a list by the JSON writer.
+                "compare_types": match_dict.get("compare_types", []),
+                **match_fields,
+                "invariants": match_dict.get("invariants", {})
             })
 
-        output_json_data[f"input_vbf_{input_index}"] = {
+        yield f"input_vbf_{input_index}", {
             "input_vbf": input_vbf_summary,
             "matches": output_matches_list
         }
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_json_data, f, indent=2)
 
+def _common_dimension(input_vbf_objects: List[VBF], export_flag: str) -> int | None:
+    # All VBF(s) must have the same field_n dimension; returns it, or None after reporting the first mismatch.
+    base_dim = input_vbf_objects[0].field_n
+    for idx, vbf_object in enumerate(input_vbf_objects):
+        if vbf_object.field_n != base_dim:
+            click.echo(f"Error: VBF #{idx} has field_n={vbf_object.field_n}, expected {base_dim}.")
+            click.echo(f"Aborting {export_flag} export due to mixed dimensions.")
+            return None
+    return base_dim
 
-def _export_poly(input_vbf_list: List[Dict[str, Any]], output_file: str):
+
+def _export_poly(input_vbf_objects: List[VBF], output_file: str):
     # Exports VBF(s) in univariate polynomial representation to a text file.
-    if not input_vbf_list:
+    if not input_vbf_objects:
         click.echo(f"No VBFs to export for --poly to {output_file}")
         return
 
-    first_vbf_object = build_vbf_from_dict(input_vbf_list[0])
-    base_dim = first_vbf_object.field_n
-
-    # All VBF(s) must have the same field_n dimension.
-    for idx, vbf_dict in enumerate(input_vbf_list):
-        vbf_object = build_vbf_from_dict(vbf_dict)
-        if vbf_object.field_n != base_dim:
-            click.echo(f"Error: VBF #{idx} has field_n={vbf_object.field_n}, expected {base_dim}.")
-            click.echo("Aborting --poly export due to mixed dimensions.")
-            return
+    base_dim = _common_dimension(input_vbf_objects, "--poly")
+    if base_dim is None:
+        return
 
+    # The file is written in one call: the dimension line, then one polynomial per line.
+    output_lines = [str(base_dim)]
+    for vbf_object in input_vbf_objects:
+        output_lines.append(polynomial_to_str(vbf_object.representation.univariate_polynomial))
     with open(output_file, "w", encoding="utf-8") as f:
-        f.write(f"{base_dim}\n")
-        for vbf_dict in input_vbf_list:
-            vbf_object = build_vbf_from_dict(vbf_dict)
-            poly_str = polynomial_to_str(vbf_object.representation.univariate_polynomial)
-            f.write(f"{poly_str}\n")
+        f.write("\n".join(output_lines) + "\n")
 
 
-def _export_tt(input_vbf_list: List[Dict[str, Any]], output_file: str):
+def _export_tt(input_vbf_objects: List[VBF], output_file: str):
     # Exports VBF(s) in truth table representation to a text file.
-    if not input_vbf_list:
+    if not input_vbf_objects:
         click.echo(f"No VBFs to export for --tt to {output_file}")
         return
 
-    first_vbf_obj = build_vbf_from_dict(input_vbf_list[0])
-    base_dim = first_vbf_obj.field_n
-
-    # All VBF(s) must have the same field_n dimension.
-    for idx, vbf_dict in enumerate(input_vbf_list):
-        vbf_object = build_vbf_from_dict(vbf_dict)
-        if vbf_object.field_n != base_dim:
-            click.echo(f"Error: VBF #{idx} has field_n={vbf_object.field_n}, expected {base_dim}.")
-            click.echo("Aborting --tt export due to mixed dimensions.")
-            return
+    base_dim = _common_dimension(input_vbf_objects, "--tt")
+    if base_dim is None:
+        return
 
+    # Truth table values lie in [0, 2^n), so the text of every value is made once and each
+    # truth table is turned into text with one numpy gather instead of a str() call per value.
+    value_strings = np.array([str(value) for value in range(1 << base_dim)], dtype=object)
+
+    # The file is written in one call: the dimension line, then each VBF's truth table on a
+    # separate line.
+    output_lines = [str(base_dim)]
+    for vbf_object in input_vbf_objects:
+        rep = vbf_object.get_truth_table()  # or vbf_obj._get_truth_table_list()
+        tt_values = rep.truth_table
+        output_lines.append(" ".join(value_strings[np.asarray(tt_values, dtype=np.intp)].tolist()))
     with open(output_file, "w", encoding="utf-8") as f:
-        f.write(f"{base_dim}\n")
-        for vbf_dict in input_vbf_list:
-            vbf_object = build_vbf_from_dict(vbf_dict)
-            rep = vbf_object.get_truth_table()  # or vbf_obj._get_truth_table_list()
-            tt_values = rep.truth_table
-
-            # Write each VBF's truth table on a separate line.
-            f.write(" ".join(str(x) for x in tt_values))
-            f.write("\n")
\ No newline at end of file
+        f.write("\n".join(output_lines) + "\n")
@@ -2,9 +2,10 @@ import click
 import json
 import concurrent.futures
 from typing import List, Dict, Any, Tuple
-from storage.json_storage_utils import load_input_vbfs_and_matches, save_input_vbfs_and_matches
-from cli_commands.cli_utils import build_vbf_from_dict
-from invariants import compute_all_invariants
+from storage.json_storage_utils import json_loads, load_input_vbfs_and_matches, save_input_vbfs_and_matches
+from cli_commands.cli_utils import build_vbf_from_dict, indices_by_signature, merge_group_invariants, vbf_task_payload
+from cli_commands.worker_pool import map_chunksize, progress_step
+from invariants import compute_all_invariants, has_all_invariants
 import pandas as pd
 from storage_pandas import (
     load_dataframe_for_dimension,
@@ -34,35 +35,40 @@ def store_input_cli(index, max_threads):
             click.echo(f"Invalid VBF index: {index}.")
             return
         # Process just this one VBF.
-        relevant_vbfs = [(index, vbf_dicts[index])]
+        selected_indices = [index]
     else:
-        relevant_vbfs = [(idx, vbf_d) for idx, vbf_d in enumerate(vbf_dicts)]
+        selected_indices = list(range(len(vbf_dicts)))
+
+    # VBFs whose invariants are all computed already need no worker. Identical VBFs are
+    # computed once; the results are copied to the duplicates.
+    signature_indices = indices_by_signature(vbf_dicts, [
+        idx for idx in selected_indices if not has_all_invariants(vbf_dicts[idx].get("invariants", {}))])
+    relevant_vbfs = [(idx_list[0], vbf_task_payload(vbf_dicts[idx_list[0]]))
+                     for idx_list in signature_indices.values()]
 
     click.echo("Computing invariants for selected VBF(s)...")
     updated_map = {}
 
     max_workers = max_threads or None
     with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        future_map = {}
-        for (vbf_idx, vbf_dict) in relevant_vbfs:
-            future_obj = executor.submit(_compute_invariants, (vbf_idx, vbf_dict))
-            future_map[future_obj] = vbf_idx
-
+        chunk_size = map_chunksize(len(relevant_vbfs), max_workers)
+        report_step = progress_step(len(relevant_vbfs))
         completed_count = 0
-        for future in concurrent.futures.as_completed(future_map):
-            vbf_idx_val = future_map[future]
-            try:
-                updated_dict = future.result()
-                if updated_dict is not None:
-                    updated_map[vbf_idx_val] = updated_dict
-            except Exception as exc:
-                click.echo(f"Error computing invariants for VBF #{vbf_idx_val}: {exc}", err=True)
+        for vbf_idx_val, invariants, error_message in executor.map(_compute_invariants, relevant_vbfs,
+                                                                   chunksize=chunk_size):
+            if error_message is not None:
+                click.echo(f"Error computing invariants for VBF #{vbf_idx_val}: {error_message}", err=True)
+            elif invariants is not None:
+                updated_map[vbf_idx_val] = invariants
             completed_count += 1
-            click.echo(f"Computed invariants for {completed_count} of {len(relevant_vbfs)} VBF(s).")
+            if completed_count % report_step == 0 or completed_count == len(relevant_vbfs):
+                click.echo(f"Computed invariants for {completed_count} of {len(relevant_vbfs)} VBF(s).")
 
     # Merge updated invariants back into the vbf_dicts.
-    for (vbf_idx_val, new_dict) in updated_map.items():
-        vbf_dicts[vbf_idx_val] = new_dict
+    for idx_list in signature_indices.values():
+        invariants = updated_map.get(idx_list[0])
+        if invariants is not None:
+            merge_group_invariants(vbf_dicts, idx_list, invariants)
 
     save_input_vbfs_and_matches(vbf_dicts)
 
@@ -70,28 +76,24 @@ def store_input_cli(index, max_threads):
     click.echo("Storing VBFs into the database (if they are valid and not duplicates)...")
 
     if index is not None:
-        relevant_vbfs = [(index, vbf_dicts[index])]
+        relevant_vbfs = [(index, vbf_task_payload(vbf_dicts[index]))]
     else:
-        relevant_vbfs = [(idx, vbf_d) for idx, vbf_d in enumerate(vbf_dicts)]
+        relevant_vbfs = [(idx, vbf_task_payload(vbf_d)) for idx, vbf_d in enumerate(vbf_dicts)]
 
     row_results: List[Tuple[int, Dict[str, Any]]] = []
     with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        future_map_2 = {}
-        for (vbf_idx, vbf_dict) in relevant_vbfs:
-            future_obj = executor.submit(_build_db_row, (vbf_idx, vbf_dict))
-            future_map_2[future_obj] = vbf_idx
-
+        chunk_size = map_chunksize(len(relevant_vbfs), max_workers)
+        report_step = progress_step(len(relevant_vbfs))
         completed_count_2 = 0
-        for done_future in concurrent.futures.as_completed(future_map_2):
-            vbf_idx_val = future_map_2[done_future]
-            try:
-                row_dict = done_future.result()
-                if row_dict:
-                    row_results.append((vbf_idx_val, row_dict))
-            except Exception as exc:
-                click.echo(f"Error building row for VBF #{vbf_idx_val}: {exc}", err=True)
+        for vbf_idx_val, row_dict, error_message in executor.map(_build_db_row, relevant_vbfs,
+                                                                 chunksize=chunk_size):
+            if error_message is not None:
+                click.echo(f"Error building row for VBF #{vbf_idx_val}: {error_message}", err=True)
+            elif row_dict:
+                row_results.append((vbf_idx_val, row_dict))
             completed_count_2 += 1
-            click.echo(f"Stored row for {completed_count_2} of {len(relevant_vbfs)} VBF(s).")
+            if completed_count_2 % report_step == 0 or completed_count_2 == len(relevant_vbfs):
+                click.echo(f"Stored row for {completed_count_2} of {len(relevant_vbfs)} VBF(s).")
 
     if not row_results:
         click.echo("No new rows. Possibly due to is_apn = False or other issues.")
@@ -117,8 +119,8 @@ def store_input_cli(index, max_threads):
         poly_data = []
         if poly_str:
             try:
-                poly_data = json.loads(poly_str)
-            except:
+                poly_data = json_loads(poly_str)
+            except ValueError:
                 poly_data = []
         irr_poly_str = row_dict["irr_poly"]
 
@@ -144,22 +146,31 @@ def store_input_cli(index, max_threads):
     )
 
 
-def _compute_invariants(task: Tuple[int, Dict[str, Any]]) -> Dict[str, Any]:
+def _compute_invariants(task: Tuple[int, Dict[str, Any]]) -> Tuple[int, Dict[str, Any] | None, str | None]:
+    # Returns the invariants only. Errors are returned with the index rather than raised, since
+    # one failure would end executor.map.
     vbf_index, input_vbf_dict = task
-    vbf_object = build_vbf_from_dict(input_vbf_dict)
+    try:
+        vbf_object = build_vbf_from_dict(input_vbf_dict)
+
+        compute_all_invariants(vbf_object)
+    except Exception as exc:
+        return (vbf_index, None, str(exc))
 
-    compute_all_invariants(vbf_object)
+    return (vbf_index, vbf_object.invariants, None)
 
-    # Write invariants back into the dictionary.
-    input_vbf_dict["invariants"] = vbf_object.invariants
 
-    # Returns None on any error.
-    return input_vbf_dict
+def _build_db_row(vbf_index_and_dict: Tuple[int, Dict[str, Any]]) -> Tuple[int, Dict[str, Any] | None, str | None]:
+    # Errors are returned with the index rather than raised, like in _compute_invariants.
+    vbf_index, input_vbf_dict = vbf_index_and_dict
+    try:
+        return (vbf_index, _db_row_for_vbf(input_vbf_dict), None)
+    except Exception as exc:
+        return (vbf_index, None, str(exc))
 
 
-def _build_db_row(vbf_index_and_dict: Tuple[int, Dict[str, Any]]) -> Dict[str, Any]:
+def _db_row_for_vbf(input_vbf_dict: Dict[str, Any]) -> Dict[str, Any] | None:
     # Build VBF and produce a database row for storing in the Parquet file.
-    vbf_index, input_vbf_dict = vbf_index_and_dict
     vbf_object = build_vbf_from_dict(input_vbf_dict)
 
     if not vbf_object.invariants.get("is_apn", False):
@@ -22,12 +22,15 @@ def uni3to1_equivalence_cli(single_vbf_index, max_threads):
 
     aggregator_k_to_1 = REG.get("invariant", "k_to_1")
 
-    # Ensure the k_to_1 property is computed on each VBF.
+    # Ensure the k_to_1 property is computed on each VBF. The objects are reused for the tasks
+    # below instead of being rebuilt from the same dicts.
+    input_vbf_objects: List[VBF] = []
     for vbf_dictionary in input_vbf_list:
         vbf_object = build_vbf_from_dict(vbf_dictionary)
         if "k_to_1" not in vbf_object.invariants:
             aggregator_k_to_1(vbf_object)
         vbf_dictionary["invariants"] = vbf_object.invariants
+        input_vbf_objects.append(vbf_object)
 
     # If the user specified --index, we only process that single VBF dictionary.
     if single_vbf_index is not None:
@@ -42,16 +45,17 @@ def uni3to1_equivalence_cli(single_vbf_index, max_threads):
 
     # Build concurrency tasks.
     concurrency_tasks: List[Tuple[int, int, VBF, VBF]] = []
+    no_match_lines = []
     for offset_index, single_vbf_dictionary in enumerate(chosen_vbf_dicts):
         actual_index = chosen_indices[offset_index]
         # Check if input VBF is 3-to-1.
         if single_vbf_dictionary["invariants"].get("k_to_1") != "3-to-1":
             continue
-        candidate_vbf_object = build_vbf_from_dict(single_vbf_dictionary)
+        candidate_vbf_object = input_vbf_objects[actual_index]
 
         vbf_matches = single_vbf_dictionary.get("matches", [])
         if not vbf_matches:
-            click.echo(f"No matches for input VBF {actual_index}.")
+            no_match_lines.append(f"No matches for input VBF {actual_index}.")
 
         # Build tasks for each of its matches (for each match, also check if it's 3-to-1).
         for match_index, match_dictionary in enumerate(single_vbf_dictionary.get("matches", [])):
@@ -60,6 +64,10 @@ def uni3to1_equivalence_cli(single_vbf_index, max_threads):
             match_vbf_object = build_vbf_from_dict(match_dictionary)
             concurrency_tasks.append((actual_index, match_index, candidate_vbf_object, match_vbf_object))
 
+    # The notices are written with one echo instead of one per input VBF.
+    if no_match_lines:
+        click.echo("\n".join(no_match_lines))
+
     # Run concurrency. The eq_key="uni3to1" will map to Uniform3to1EquivalenceTest.
     updated_vbf_list = run_equivalence_on_matches(
         input_vbf_list=input_vbf_list,
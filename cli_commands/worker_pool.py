@@ -0,0 +1,12 @@
+import os
+
+
+def map_chunksize(task_count: int, max_workers: int | None) -> int:
+    # About four chunks per worker: fewer IPC round trips, still balanced when task costs differ.
+    worker_count = max_workers or os.cpu_count() or 1
+    return max(1, task_count // (4 * worker_count))
+
+
+def progress_step(task_count: int) -> int:
+    # Progress is echoed about every 1% of the tasks, so the parent does not wait on the terminal.
+    return max(1, task_count // 100)
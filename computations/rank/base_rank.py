@@ -1,5 +1,6 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+import numpy as np
 from vbf_object import VBF
 
 class RankComputation(ABC):
@@ -14,4 +15,16 @@ class RankComputation(ABC):
         Implement the logic for computing the rank measure on the given vectorial
         Boolean function. Returns an integer rank or None on error.
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+def xor_translate_rows(dimension: int, points) -> list[list[int]]:
+    """
+    Rows of the dimension x dimension binary matrix with M[x][x ^ p] = 1 for every p in points,
+    as the list of lists the Sage Matrix constructor takes. Filled one point at a time, so the
+    temporary arrays stay at one row index vector.
+    """
+    matrix_rows = np.zeros((dimension, dimension), dtype=np.uint8)
+    row_indices = np.arange(dimension)
+    for point in np.asarray(points, dtype=np.int64):
+        matrix_rows[row_indices, row_indices ^ point] = 1
+    return matrix_rows.tolist()
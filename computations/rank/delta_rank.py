@@ -1,7 +1,8 @@
 from __future__ import annotations
 from math import log2
+import numpy as np
 from sage.all import Matrix, GF
-from computations.rank.base_rank import RankComputation
+from computations.rank.base_rank import RankComputation, xor_translate_rows
 from registry import REG
 
 """
@@ -11,10 +12,7 @@ Delta Rank implementations are adapted from the code provided in:
 We do not claim authorship of the original math. Big thanks to the authors.
 """
 
-def oplus(x: int, y: int) -> int:
-    return x ^ y
-
-def ddt(func_tt_values: list[int]) -> list[list[int]]:
+def ddt(func_tt_values: list[int]) -> np.ndarray:
     """
     Compute the Difference Distribution Table (DDT) for the function F,
     where F is a list of length 2^n representing a truth table (0-based).
@@ -22,12 +20,12 @@ def ddt(func_tt_values: list[int]) -> list[list[int]]:
     """
     dimension_n = int(log2(len(func_tt_values)))
     size = 1 << dimension_n
-    table = [[0]*size for _ in range(size)]
-    for x in range(size):
-        for a in range(size):
-            diff = func_tt_values[x] ^ func_tt_values[x ^ a]
-            table[a][diff] += 1
-    return table
+    tt_values = np.asarray(func_tt_values, dtype=np.int64)
+    x_values = np.arange(size)
+    # diff[a][x] = f[x] ^ f[x ^ a]; each row a is counted into row a of the table.
+    diff = tt_values[x_values[None, :]] ^ tt_values[x_values[:, None] ^ x_values[None, :]]
+    flat_counts = np.bincount((x_values[:, None] * size + diff).ravel(), minlength=size * size)
+    return flat_counts.reshape(size, size)
 
 class DeltaRankComputation(RankComputation):
     """
@@ -46,20 +44,11 @@ class DeltaRankComputation(RankComputation):
         table_ddt = ddt(func_values)
 
         # Collect all pairs (a,b) with table_ddt[a][b] == 2, skipping a=0.
-        delta_pairs = []
-        size = 1 << n
-        for a in range(1, size):
-            for b in range(size):
-                if table_ddt[a][b] == 2:
-                    delta_pairs.append((a << n) | b)
+        a_values, b_values = np.nonzero(table_ddt[1:] == 2)
+        delta_pairs = ((a_values + 1) << n) | b_values
 
         # Build a 2^(2n) x 2^(2n) binary matrix.
-        mat_content = []
-        for x in range(dimension):
-            row = [0]*dimension
-            for pair_val in delta_pairs:
-                row[oplus(x, pair_val)] = 1
-            mat_content.append(row)
+        mat_content = xor_translate_rows(dimension, delta_pairs)
 
         mat_gf2 = Matrix(GF(2), dimension, dimension, mat_content)
         return mat_gf2.rank()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from math import log2
 from sage.all import Matrix, GF
-from computations.rank.base_rank import RankComputation
+from computations.rank.base_rank import RankComputation, xor_translate_rows
 from registry import REG
 
 """
@@ -11,9 +11,6 @@ Gamma Rank implementations are adapted from the code provided in:
 We do not claim authorship of the original math. Big thanks to the authors.
 """
 
-def oplus(x: int, y: int) -> int:
-    return x ^ y
-
 class GammaRankComputation(RankComputation):
     """
     Implementation of the Gamma-rank.
@@ -32,12 +29,7 @@ class GammaRankComputation(RankComputation):
         gamma_list = [(x << n) | func_values[x] for x in range(size)]
 
         # # Build the binary matrix content.
-        mat_content = []
-        for x in range(dimension):
-            row = [0]*dimension
-            for y in gamma_list:
-                row[oplus(x, y)] = 1
-            mat_content.append(row)
+        mat_content = xor_translate_rows(dimension, gamma_list)
 
         # Convert to Sage matrix over GF(2) and compute rank.
         mat_gf2 = Matrix(GF(2), dimension, dimension, mat_content)
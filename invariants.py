@@ -1,23 +1,25 @@
-from typing import List
+from typing import Any, Dict, List
 from registry import REG
 from vbf_object import VBF
 
 
+# The invariants compute_all_invariants fills in, in their preferred display order.
+ALL_INVARIANT_KEYS = (
+    "odds",
+    "odws",
+    "delta_rank",
+    "gamma_rank",
+    "algebraic_degree",
+    "is_quadratic",
+    "is_apn",
+    "is_monomial",
+    "k_to_1",
+    "diff_uni",
+)
+
+
 def compute_all_invariants(vbf_object: VBF) -> None:
-    all_invariants = [
-        "odds", 
-        "odws",
-        "delta_rank", 
-        "gamma_rank",
-        "algebraic_degree",
-        "is_quadratic",
-        "is_apn",
-        "is_monomial",
-        "k_to_1", 
-        "diff_uni"
-    ]
-
-    for key in all_invariants:
+    for key in ALL_INVARIANT_KEYS:
         compute_missing(vbf_object, key)
 
     reorder_invariants(vbf_object)
@@ -25,23 +27,14 @@ def compute_all_invariants(vbf_object: VBF) -> None:
 
 def reorder_invariants(vbf_object: VBF) -> None:
     # Reorders the vbf_object.invariants dictionary into a preferred display order.
-    desired_order = [
-        "odds", 
-        "odws",
-        "delta_rank", 
-        "gamma_rank",
-        "algebraic_degree",
-        "is_quadratic",
-        "is_apn",
-        "is_monomial",
-        "k_to_1", 
-        "diff_uni"
-    ]
-
-    old_map = vbf_object.invariants
+    vbf_object.invariants = ordered_invariants(vbf_object.invariants)
+
+
+def ordered_invariants(old_map: Dict[str, Any]) -> Dict[str, Any]:
+    # A copy of an invariants dictionary in the preferred display order.
     new_map = {}
 
-    for key in desired_order:
+    for key in ALL_INVARIANT_KEYS:
         if key in old_map:
             new_map[key] = old_map[key]
 
@@ -50,7 +43,7 @@ def reorder_invariants(vbf_object: VBF) -> None:
         if leftover_key not in new_map:
             new_map[leftover_key] = old_map[leftover_key]
 
-    vbf_object.invariants = new_map
+    return new_map
 
 
 def compute_selected(vbf_object: VBF, invariants_list: List[str]) -> None:
@@ -60,6 +53,11 @@ def compute_selected(vbf_object: VBF, invariants_list: List[str]) -> None:
     reorder_invariants(vbf_object)
 
 
+def has_all_invariants(invariants: Dict[str, Any]) -> bool:
+    # True if compute_all_invariants would not compute anything.
+    return all(key in invariants for key in ALL_INVARIANT_KEYS)
+
+
 def compute_missing(vbf_object: VBF, invariant_name: str) -> None:
     if invariant_name in vbf_object.invariants:
         return
@@ -1,7 +1,19 @@
+import base64
 import json
+import numpy as np
 from pathlib import Path
-from typing import List, Dict, Any
-from cli_commands.cli_utils import polynomial_to_str
+from typing import Any, Dict, Iterable, List, Tuple
+from cli_commands.cli_utils import intern_irr_poly, polynomial_to_str
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional, the standard library json module is used without it.
+    orjson = None
+
+# The JSON parser for the storage files, the Parquet JSON columns and the commands; orjson accepts
+# str and bytes, and its decode error is a ValueError like json's.
+json_loads = orjson.loads if orjson is not None else json.loads
 
 STORAGE_DIR = "storage"
 INPUT_VBFS_AND_MATCHES_FILE = Path(STORAGE_DIR) / "input_vbfs_and_matches.json"
@@ -12,6 +24,59 @@ def ensure_storage_folder():
     if not storage_path.is_dir():
         storage_path.mkdir(parents=True, exist_ok=True)
 
+def _json_default(value: Any) -> Any:
+    # numpy values (e.g. invariants computed with numpy) as plain Python values, and sets (e.g. a
+    # compare_types set) as lists. orjson and json.dump both call this, so the two paths accept
+    # the same objects.
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _read_json_file(file_path: Path) -> Any:
+    if orjson is not None:
+        return orjson.loads(file_path.read_bytes())
+    with file_path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_json_file(file_path: Path, data: Any) -> None:
+    # Writes data as JSON indented by 2 spaces; also used by the save command's exports.
+    if orjson is not None:
+        options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        file_path.write_bytes(orjson.dumps(data, default=_json_default, option=options))
+        return
+    # Serialized first and written in one call; json.dump writes every token separately.
+    with file_path.open("w", encoding="utf-8") as f:
+        f.write(json.dumps(data, indent=2, default=_json_default))
+
+def write_json_object_entries(file_path: Path, entries: Iterable[Tuple[str, Any]]) -> None:
+    # Writes the same file as write_json_file(file_path, dict(entries)), one entry at a time, so
+    # the whole object and its serialized text are never held in memory at once. A 1 MiB buffer
+    # gathers the small key and separator writes with the entries into few write calls.
+    with file_path.open("wb", buffering=1 << 20) as f:
+        separator = b"{\n  "
+        for key, value in entries:
+            # The entry is serialized at the top level and indented one level by prefixing its lines.
+            f.write(separator + _json_dumps_indented(key) + b": ")
+            f.write(_json_dumps_indented(value).replace(b"\n", b"\n  "))
+            separator = b",\n  "
+        f.write(b"{}" if separator == b"{\n  " else b"\n}")
+
+def json_dumps_compact(data: Any) -> bytes:
+    # JSON without indentation, e.g. for data embedded in a page.
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+def _json_dumps_indented(data: Any) -> bytes:
+    # The text write_json_file writes for data (JSON strings hold no raw newlines).
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, default=_json_default).encode("utf-8")
+
 # --------------------------------------------------------------
 # input_vbfs_and_matches.json
 # --------------------------------------------------------------
@@ -20,8 +85,7 @@ def load_input_vbfs_and_matches() -> List[Dict[str, Any]]:
     ensure_storage_folder()
     if not INPUT_VBFS_AND_MATCHES_FILE.is_file():
         return []
-    with INPUT_VBFS_AND_MATCHES_FILE.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = _read_json_file(INPUT_VBFS_AND_MATCHES_FILE)
 
     if "input_vbfs" not in data:
         return []
@@ -29,11 +93,23 @@ def load_input_vbfs_and_matches() -> List[Dict[str, Any]]:
     # Convert odds and odws dict keys to integer keys after loading.
     for vbf_dictionary in data["input_vbfs"]:
         _unify_integer_keys_odds_odws(vbf_dictionary)
+        _decode_cached_tt(vbf_dictionary)
+        _intern_irr_poly(vbf_dictionary)
         for match_dict in vbf_dictionary.get("matches", []):
             _unify_integer_keys_odds_odws(match_dict)
+            _decode_cached_tt(match_dict)
+            _intern_irr_poly(match_dict)
 
     return data["input_vbfs"]
 
+def load_input_vbf_match_counts() -> List[int]:
+    # The number of matches of each input VBF, without decoding the stored cached_tt tables.
+    ensure_storage_folder()
+    if not INPUT_VBFS_AND_MATCHES_FILE.is_file():
+        return []
+    data = _read_json_file(INPUT_VBFS_AND_MATCHES_FILE)
+    return [len(vbf_dictionary.get("matches", [])) for vbf_dictionary in data.get("input_vbfs", [])]
+
 def save_input_vbfs_and_matches(vbf_list: List[Dict[str, Any]]) -> None:
     # Writes the entire input VBF + matches structure to input_vbfs_and_matches.json.
     ensure_storage_folder()
@@ -49,12 +125,9 @@ def save_input_vbfs_and_matches(vbf_list: List[Dict[str, Any]]) -> None:
                 if isinstance(match_item.get("poly"), list):
                     match_item["poly_str"] = polynomial_to_str(match_item["poly"])
 
-    data = {"input_vbfs": vbf_list}
+    data = {"input_vbfs": [_with_encoded_cached_tt(vbf_dictionary) for vbf_dictionary in vbf_list]}
 
-    with INPUT_VBFS_AND_MATCHES_FILE.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-        # Store arrays in one line (horizontally).
-        # json.dump(data, f, indent=None, separators=(",", ":"))
+    write_json_file(INPUT_VBFS_AND_MATCHES_FILE, data)
 
 # --------------------------------------------------------------
 # equivalence_list.json
@@ -64,13 +137,44 @@ def load_equivalence_list() -> List[Dict[str, Any]]:
     ensure_storage_folder()
     if not EQUIVALENCE_LIST_FILE.is_file():
         return []
-    with EQUIVALENCE_LIST_FILE.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return _read_json_file(EQUIVALENCE_LIST_FILE)
 
 def save_equivalence_list(eq_list: List[Dict[str, Any]]) -> None:
     ensure_storage_folder()
-    with EQUIVALENCE_LIST_FILE.open("w", encoding="utf-8") as f:
-        json.dump(eq_list, f, indent=2)
+    write_json_file(EQUIVALENCE_LIST_FILE, eq_list)
+
+# --------------------------------------------------------------
+# Helpers to store cached_tt as base64 of little-endian uint16 values.
+# --------------------------------------------------------------
+def _encode_cached_tt(cached_tt: Any) -> Any:
+    # One string instead of 2^n JSON numbers; tables that do not fit uint16 are kept as they are.
+    tt_array = np.asarray(cached_tt)
+    if tt_array.size == 0 or tt_array.min() < 0 or tt_array.max() > 0xFFFF:
+        return cached_tt
+    return base64.b64encode(tt_array.astype("<u2").tobytes()).decode("ascii")
+
+def _decode_cached_tt(vbf_dictionary: Dict[str, Any]) -> None:
+    # cached_tt is kept as a uint16 array in memory: 2 bytes per entry, and it pickles to the
+    # worker processes as one buffer. Older files store it as a list of integers.
+    cached_tt = vbf_dictionary.get("cached_tt")
+    if isinstance(cached_tt, str):
+        vbf_dictionary["cached_tt"] = np.frombuffer(base64.b64decode(cached_tt), dtype="<u2").astype(np.uint16)
+    elif isinstance(cached_tt, list) and cached_tt and 0 <= min(cached_tt) and max(cached_tt) <= 0xFFFF:
+        vbf_dictionary["cached_tt"] = np.asarray(cached_tt, dtype=np.uint16)
+
+def _with_encoded_cached_tt(vbf_dictionary: Dict[str, Any]) -> Dict[str, Any]:
+    # Shallow copies, so the caller's dictionaries keep their cached_tt arrays or lists.
+    encoded_dictionary = dict(vbf_dictionary)
+    if isinstance(encoded_dictionary.get("cached_tt"), (list, np.ndarray)):
+        encoded_dictionary["cached_tt"] = _encode_cached_tt(encoded_dictionary["cached_tt"])
+    if "matches" in encoded_dictionary:
+        encoded_dictionary["matches"] = [_with_encoded_cached_tt(match_item)
+                                         for match_item in encoded_dictionary["matches"]]
+    return encoded_dictionary
+
+def _intern_irr_poly(vbf_dictionary: Dict[str, Any]) -> None:
+    if "irr_poly" in vbf_dictionary:
+        vbf_dictionary["irr_poly"] = intern_irr_poly(vbf_dictionary["irr_poly"])
 
 # --------------------------------------------------------------
 # Helper to unify odds and odws dict keys as integers.
@@ -1,9 +1,11 @@
 import os
 import pandas as pd
 import json
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 from vbf_object import VBF
 from invariants import compute_all_invariants
+from storage.json_storage_utils import json_loads
+
 
 def get_parquet_filename(dimension: int, is_apn: bool) -> str:
     """
@@ -27,12 +29,11 @@ def is_duplicate_candidate(dataframe: pd.DataFrame, dimension_n: int,
     if matching_rows.empty:
         return False
 
-    for _, row in matching_rows.iterrows():
-        poly_str = row["poly"]
+    for poly_str in matching_rows["poly"].tolist():
         if not poly_str:
             continue
         try:
-            existing_poly = json.loads(poly_str)
+            existing_poly = json_loads(poly_str)
             existing_sorted = sorted(existing_poly, key=lambda t: (t[0], t[1]))
             if existing_sorted == sorted_candidate:
                 return True
@@ -179,7 +180,7 @@ def store_vbf_pandas(polynomial_terms: List[Tuple[int, int]], dimension: int, ir
     poly_data = []
     if poly_str:
         try:
-            poly_data = json.loads(poly_str)
+            poly_data = json_loads(poly_str)
         except:
             pass
 
@@ -203,6 +204,45 @@ def store_vbf_pandas(polynomial_terms: List[Tuple[int, int]], dimension: int, ir
 # LOADING + RECONSTRUCTING VBF OBJECTS
 # --------------------------------------------------------------
 
+def _fast_parse_int_int_dict(json_string: str) -> Dict[int, int]:
+    # Parses a flat JSON object such as '{"0": 12, "4": 3}' without json.loads.
+    # Raises ValueError on anything else.
+    body = json_string.strip()
+    if not (body.startswith("{") and body.endswith("}")):
+        raise ValueError("not a JSON object")
+    body = body[1:-1]
+    result = {}
+    if not body.strip():
+        return result
+    for piece in body.split(","):
+        key, separator, val = piece.partition(":")
+        if not separator:
+            raise ValueError("missing ':' in JSON object")
+        result[int(key.strip().strip('"'))] = int(val)
+    return result
+
+
+def parse_spectrum(value: Any) -> Any:
+    # ODDS/ODWS as an int-keyed dict, from a stored JSON string or a dict with string keys. Other
+    # values ("non-quadratic", or text that is not a JSON object of ints) are returned as they are.
+    if isinstance(value, str):
+        if not value.startswith("{"):
+            return value
+        try:
+            return _fast_parse_int_int_dict(value)
+        except ValueError:
+            pass
+        try:
+            value = json_loads(value)
+        except ValueError:
+            return value
+    if isinstance(value, dict):
+        try:
+            return {int(key): int(val) for key, val in value.items()}
+        except (ValueError, TypeError):
+            return value
+    return value
+
 def load_objects_for_dimension_pandas(dimension: int, is_apn: bool = True) -> List[VBF]:
     """
     Loads all entries for dimension n from the Parquet file, reconstructs VBF objects, and 
@@ -218,90 +258,110 @@ def load_objects_for_dimension_pandas(dimension: int, is_apn: bool = True) -> Li
         )
         return []
 
+    return vbf_objects_from_dataframe(loaded_dataframe, dimension)
+
+
+def invariant_keys_in_dataframe(loaded_dataframe: pd.DataFrame) -> set:
+    # The invariant keys that vbf_objects_from_dataframe sets on at least one VBF, read from the
+    # columns alone. Lets callers plan work before the (slower) object reconstruction.
+    if loaded_dataframe.empty:
+        return set()
+
+    invariant_keys = {"odds", "odws", "is_quadratic", "is_apn", "is_monomial", "k_to_1", "citation"}
+    for numeric_key in ("delta_rank", "gamma_rank", "algebraic_degree"):
+        if numeric_key in loaded_dataframe.columns and loaded_dataframe[numeric_key].notna().any():
+            invariant_keys.add(numeric_key)
+    return invariant_keys
+
+
+def polynomials_from_dataframe(loaded_dataframe: pd.DataFrame) -> List[list]:
+    # The stored univariate polynomials (term lists) of every row, without building VBF objects. A
+    # missing or unreadable polynomial is an empty list, as in vbf_objects_from_dataframe.
+    if "poly" not in loaded_dataframe.columns:
+        return [[] for _ in range(len(loaded_dataframe))]
+
+    polynomial_list = []
+    for polynomial_json_string in loaded_dataframe["poly"].tolist():
+        polynomial_data = []
+        if polynomial_json_string:
+            try:
+                polynomial_data = json_loads(polynomial_json_string)
+            except (ValueError, TypeError):
+                polynomial_data = []
+        polynomial_list.append(polynomial_data)
+    return polynomial_list
+
+
+def vbf_objects_from_dataframe(loaded_dataframe: pd.DataFrame, dimension: int) -> List[VBF]:
+    # Reconstructs the VBF objects (with invariants) from a loaded dimension dataframe.
     vbf_list: List[VBF] = []
 
-    for index, row in loaded_dataframe.iterrows():
+    # Each column is read once as a list (with the default for a missing column), instead of
+    # materializing a Series per row.
+    def column_values(column_name, default_value):
+        if column_name in loaded_dataframe.columns:
+            return loaded_dataframe[column_name].tolist()
+        return [default_value] * len(loaded_dataframe)
+
+    row_columns = zip(
+        loaded_dataframe.index.tolist(),
+        column_values("poly", ""),
+        column_values("field_n", dimension),
+        column_values("irr_poly", ""),
+        column_values("odds", "non-quadratic"),
+        column_values("odws", "non-quadratic"),
+        column_values("delta_rank", None),
+        column_values("gamma_rank", None),
+        column_values("algebraic_degree", None),
+        column_values("is_quadratic", False),
+        column_values("is_apn", False),
+        column_values("is_monomial", False),
+        column_values("k_to_1", "unknown"),
+        column_values("citation", ""),
+    )
+
+    for (index, polynomial_json_string, field_n_value, irr_poly_value, odds_value, odws_value,
+         delta_rank_value, gamma_rank_value, algebraic_degree_value, is_quadratic_value, is_apn_value,
+         is_monomial_value, k_to_1_value, citation_value) in row_columns:
         try:
             # Parse polynomial from the stored JSON.
-            polynomial_json_string = row.get("poly", "")
             polynomial_data = []
             if polynomial_json_string:
                 try:
-                    polynomial_data = json.loads(polynomial_json_string)
+                    polynomial_data = json_loads(polynomial_json_string)
                 except:
                     polynomial_data = []
 
-            dimension_n  = int(row.get("field_n", dimension))
-            irr_poly_value = row.get("irr_poly", "")
+            dimension_n  = int(field_n_value)
 
             # Build an VBF object directly.
             vbf_object = VBF(polynomial_data, dimension_n, irr_poly_value)
             if not hasattr(vbf_object, "invariants"):
                 vbf_object.invariants = {}
 
-            # Reconstruct ODDS if it's JSON.
-            odds_column_value = row.get("odds", "non-quadratic")
-            if isinstance(odds_column_value, str):
-                if odds_column_value == "non-quadratic":
-                    vbf_object.invariants["odds"] = "non-quadratic"
-                else:
-                    try:
-                        parsed_odds = json.loads(odds_column_value)
-                        if isinstance(parsed_odds, dict):
-                            odds_dictionary = {}
-                            for key, val in parsed_odds.items():
-                                odds_dictionary[int(key)] = int(val)
-                            vbf_object.invariants["odds"] = odds_dictionary
-                        else:
-                            vbf_object.invariants["odds"] = parsed_odds
-                    except:
-                        vbf_object.invariants["odds"] = "non-quadratic"
-            else:
-                vbf_object.invariants["odds"] = odds_column_value
-
-            # Reconstruct ODWS if it's JSON.
-            odws_column_value = row.get("odws", "non-quadratic")
-            if isinstance(odws_column_value, str):
-                if odws_column_value == "non-quadratic":
-                    vbf_object.invariants["odws"] = "non-quadratic"
-                else:
-                    try:
-                        parsed_odws = json.loads(odws_column_value)
-                        if isinstance(parsed_odws, dict):
-                            odws_dictionary = {}
-                            for key, val in parsed_odws.items():
-                                odws_dictionary[int(key)] = int(val)
-                            vbf_object.invariants["odws"] = odws_dictionary
-                        else:
-                            vbf_object.invariants["odws"] = parsed_odws
-                    except:
-                        vbf_object.invariants["odws"] = "non-quadratic"
-            else:
-                vbf_object.invariants["odws"] = odws_column_value
+            # Reconstruct ODDS/ODWS as int-keyed dicts once here, so compare can use plain equality.
+            vbf_object.invariants["odds"] = parse_spectrum(odds_value)
+            vbf_object.invariants["odws"] = parse_spectrum(odws_value)
 
             # Numeric columns.
-            delta_rank_value = row.get("delta_rank", None)
             if pd.notna(delta_rank_value):
                 vbf_object.invariants["delta_rank"] = int(delta_rank_value)
 
-            gamma_rank_value = row.get("gamma_rank", None)
             if pd.notna(gamma_rank_value):
                 vbf_object.invariants["gamma_rank"] = int(gamma_rank_value)
 
-            algebraic_degree_value = row.get("algebraic_degree", None)
             if pd.notna(algebraic_degree_value):
                 vbf_object.invariants["algebraic_degree"] = int(algebraic_degree_value)
 
             # Boolean columns.
-            vbf_object.invariants["is_quadratic"] = bool(row.get("is_quadratic", False))
-            vbf_object.invariants["is_apn"]       = bool(row.get("is_apn", False))
-            vbf_object.invariants["is_monomial"]  = bool(row.get("is_monomial", False))
+            vbf_object.invariants["is_quadratic"] = bool(is_quadratic_value)
+            vbf_object.invariants["is_apn"]       = bool(is_apn_value)
+            vbf_object.invariants["is_monomial"]  = bool(is_monomial_value)
 
             # k_to_1 column.
-            vbf_object.invariants["k_to_1"] = row.get("k_to_1","unknown")
+            vbf_object.invariants["k_to_1"] = k_to_1_value
 
             # Citation
-            citation_value = row.get("citation","")
             vbf_object.invariants["citation"] = citation_value if pd.notna(citation_value) else ""
 
             vbf_list.append(vbf_object)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The modules live at the repository root, which is the working directory of the CLI.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,189 @@
+import json
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cli_commands.compare_cmd import (DBInvariantTable, _compare_vbf_invariants, _find_candidate_indices,
+                                      _find_matching_db_indices, _find_matching_db_indices_numpy,
+                                      _spectrum_hash)
+
+
+def _apn_matches(input_invariant, db_invariant, needed_keys):
+    # Per-VBF comparison used by compare before the column table existed.
+    def _try_int(x):
+        try:
+            return int(x)
+        except (ValueError, TypeError):
+            return x
+
+    def _parse_spectrum(value):
+        if value == "non-quadratic":
+            return "non-quadratic"
+        if isinstance(value, dict):
+            return {int(key): int(val) for key, val in value.items()}
+        if isinstance(value, str) and value.startswith("{"):
+            try:
+                parsed = json.loads(value)
+                if isinstance(parsed, dict):
+                    return {int(key): int(val) for key, val in parsed.items()}
+                return parsed
+            except (ValueError, TypeError):
+                return value
+        return value
+
+    for key in needed_keys:
+        if key not in input_invariant or key not in db_invariant:
+            return False
+        if key in ("odds", "odws"):
+            if _parse_spectrum(input_invariant[key]) != _parse_spectrum(db_invariant[key]):
+                return False
+        elif _try_int(input_invariant[key]) != _try_int(db_invariant[key]):
+            return False
+    return True
+
+
+def _random_invariants(rng):
+    spectra = [{0: 2205, 2: 1764, 8: 63}, {0: 1764, 8: 1680, 16: 588}, "non-quadratic"]
+    return {
+        "odds": rng.choice(spectra),
+        "odws": rng.choice(spectra),
+        "delta_rank": rng.choice([430, 432, 434]),
+        "gamma_rank": rng.choice([2138, 2140]),
+        "algebraic_degree": rng.choice([2, 3]),
+        "is_quadratic": rng.choice([True, False]),
+        "citation": rng.choice(["Budaghyan et al.", "Edel, Pott"]),
+    }
+
+
+def _table_matches(db_table, input_invariants, invariant_keys):
+    # The compare flow: column candidates first, then the keys without a column and the spectra.
+    other_keys = [key for key in invariant_keys
+                  if key not in db_table.column_keys or key in ("odds", "odws")]
+    return [db_vbf for db_vbf in db_table.candidates(input_invariants)
+            if _compare_vbf_invariants(input_invariants, db_vbf.invariants, other_keys)]
+
+
+# --------------------------------------------------------------
+# _spectrum_hash
+# --------------------------------------------------------------
+def test_spectrum_hash_known_values():
+    # Fixed values: unlike hash(), the result does not depend on the process or PYTHONHASHSEED.
+    assert _spectrum_hash({0: 2205, 2: 1764, 8: 63}) == 8240494560650672442
+    assert _spectrum_hash({0: 1764, 8: 1680, 16: 588}) == 6837458021971004321
+    assert _spectrum_hash({}) == 0
+    assert _spectrum_hash("non-quadratic") == -1
+
+
+def test_spectrum_hash_ignores_order_and_key_types():
+    spectrum = {0: 2205, 2: 1764, 8: 63}
+    expected = _spectrum_hash(spectrum)
+    assert _spectrum_hash(dict(reversed(list(spectrum.items())))) == expected
+    assert _spectrum_hash({str(key): val for key, val in spectrum.items()}) == expected
+    assert _spectrum_hash(json.dumps(spectrum)) == expected
+
+
+def test_spectrum_hash_fits_int64_and_separates_spectra():
+    rng = random.Random(7)
+    hashes = {}
+    for _ in range(500):
+        spectrum = {rng.randrange(64): rng.randrange(1, 4096) for _ in range(rng.randrange(1, 6))}
+        spectrum_hash = _spectrum_hash(spectrum)
+        assert 0 <= spectrum_hash < 2**63
+        hashes.setdefault(spectrum_hash, spectrum)
+        assert hashes[spectrum_hash] == spectrum
+
+
+def test_spectrum_hash_rejects_unparsable_values():
+    assert _spectrum_hash("not a spectrum") is None
+    assert _spectrum_hash(None) is None
+    assert _spectrum_hash({"0": "corrupt"}) is None
+    assert _spectrum_hash({None: 3}) is None
+
+
+# --------------------------------------------------------------
+# DBInvariantTable / _find_matching_db_indices
+# --------------------------------------------------------------
+@pytest.fixture
+def db_vbf_list():
+    rng = random.Random(2024)
+    return [SimpleNamespace(invariants=_random_invariants(rng)) for _ in range(400)]
+
+
+@pytest.mark.parametrize("build_lookup", [False, True])
+def test_table_matches_per_vbf_comparison(db_vbf_list, build_lookup):
+    invariant_keys = ["odds", "odws", "delta_rank", "gamma_rank", "algebraic_degree", "is_quadratic", "citation"]
+    db_table = DBInvariantTable(db_vbf_list, invariant_keys)
+    if build_lookup:
+        db_table.build_lookup()
+    assert "citation" not in db_table.column_keys
+
+    rng = random.Random(99)
+    input_list = [db_vbf.invariants for db_vbf in db_vbf_list[:20]] + [_random_invariants(rng) for _ in range(20)]
+    for input_invariants in input_list:
+        expected = [db_vbf for db_vbf in db_vbf_list if _apn_matches(input_invariants, db_vbf.invariants, invariant_keys)]
+        assert _table_matches(db_table, input_invariants, invariant_keys) == expected
+
+
+def test_table_matches_string_stored_invariants(db_vbf_list):
+    # Hand-edited inputs carry the same values as strings and string-keyed spectra.
+    invariant_keys = ["odds", "delta_rank", "algebraic_degree"]
+    db_table = DBInvariantTable(db_vbf_list, invariant_keys)
+    db_invariants = db_vbf_list[0].invariants
+    input_invariants = {
+        "odds": db_invariants["odds"] if db_invariants["odds"] == "non-quadratic" else json.dumps(db_invariants["odds"]),
+        "delta_rank": str(db_invariants["delta_rank"]),
+        "algebraic_degree": db_invariants["algebraic_degree"],
+    }
+    expected = [db_vbf for db_vbf in db_vbf_list if _apn_matches(input_invariants, db_vbf.invariants, invariant_keys)]
+    assert expected
+    assert _table_matches(db_table, input_invariants, invariant_keys) == expected
+
+
+def test_table_skips_malformed_stored_spectrum(db_vbf_list):
+    # A corrupt stored spectrum cannot be hashed; the spectrum is then compared exactly instead.
+    db_vbf_list[3].invariants["odds"] = {"0": "corrupt"}
+    invariant_keys = ["odds", "delta_rank"]
+    db_table = DBInvariantTable(db_vbf_list, invariant_keys)
+    assert "odds" not in db_table.column_keys
+    input_invariants = db_vbf_list[0].invariants
+    expected = [db_vbf for db_index, db_vbf in enumerate(db_vbf_list)
+                if db_index != 3 and _apn_matches(input_invariants, db_vbf.invariants, invariant_keys)]
+    assert _table_matches(db_table, input_invariants, invariant_keys) == expected
+
+
+def test_table_without_candidates_for_missing_invariant(db_vbf_list):
+    db_table = DBInvariantTable(db_vbf_list, ["delta_rank", "gamma_rank"])
+    assert db_table.candidates({"delta_rank": 430}) == []
+
+
+def test_table_uses_narrowest_column_dtype(db_vbf_list):
+    scalar_table = DBInvariantTable(db_vbf_list, ["delta_rank", "algebraic_degree"])
+    assert scalar_table.db_columns.dtype == np.int16
+    assert DBInvariantTable(db_vbf_list, ["algebraic_degree"]).db_columns.dtype == np.int8
+    assert DBInvariantTable(db_vbf_list, ["odds", "algebraic_degree"]).db_columns.dtype == np.int64
+    # 430 + 65536 would wrap to 430 in int16; it must not match.
+    assert scalar_table.candidates({"delta_rank": 430 + 65536, "algebraic_degree": 2}) == []
+    assert scalar_table.candidates({"delta_rank": 430, "algebraic_degree": 2})
+
+
+@pytest.mark.parametrize("dtype", [np.int8, np.int16, np.int64])
+def test_find_matching_db_indices_agrees_with_numpy(dtype):
+    rng = np.random.default_rng(5)
+    db_columns = rng.integers(0, 3, size=(4, 1000)).astype(dtype)
+    for db_index in (0, 17, 999):
+        input_values = db_columns[:, db_index].copy()
+        expected = _find_matching_db_indices_numpy(input_values, db_columns)
+        assert db_index in expected
+        assert np.array_equal(_find_matching_db_indices(input_values, db_columns), expected)
+    assert _find_matching_db_indices(np.full(4, 7, dtype=dtype), db_columns).size == 0
+
+
+def test_find_candidate_indices_agrees_with_numpy():
+    rng = np.random.default_rng(6)
+    db_columns = rng.integers(0, 3, size=(4, 1000)).astype(np.int64)
+    for db_index in (0, 17, 999):
+        input_values = db_columns[:, db_index].copy()
+        expected = _find_matching_db_indices_numpy(input_values, db_columns)
+        assert np.array_equal(_find_candidate_indices(input_values, db_columns), expected)
@@ -0,0 +1,40 @@
+import json
+import random
+
+import pytest
+
+from storage_pandas import _fast_parse_int_int_dict
+
+
+@pytest.mark.parametrize("json_string", [
+    '{"0": 2205, "2": 1764, "8": 63}',
+    '{"0":1764,"8":1680,"16":588}',
+    '  { "4" : 12 ,\n "-2": -3 }  ',
+    '{"12": 0}',
+    '{}',
+])
+def test_fast_parse_int_int_dict_matches_json_loads(json_string):
+    expected = {int(key): val for key, val in json.loads(json_string).items()}
+    assert _fast_parse_int_int_dict(json_string) == expected
+
+
+def test_fast_parse_int_int_dict_random_spectra():
+    rng = random.Random(11)
+    for _ in range(200):
+        spectrum = {rng.randrange(2**10): rng.randrange(2**20) for _ in range(rng.randrange(8))}
+        for separators in ((",", ":"), (", ", ": ")):
+            json_string = json.dumps(spectrum, separators=separators)
+            assert _fast_parse_int_int_dict(json_string) == spectrum
+
+
+@pytest.mark.parametrize("json_string", [
+    "non-quadratic",
+    "[1, 2]",
+    '{"a": 1}',
+    '{"0": 1.5}',
+    '{"0": {"1": 2}}',
+    '{"0" 1}',
+])
+def test_fast_parse_int_int_dict_rejects_other_json(json_string):
+    with pytest.raises(ValueError):
+        _fast_parse_int_int_dict(json_string)
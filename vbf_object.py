@@ -4,10 +4,38 @@ from representations.abstract_representation import Representation
 from computations.poly_parse_utils import determine_irr_poly_str_for_polynomial
 from computations.poly_parse_utils import parse_irreducible_poly_str, bitmask_to_poly_str
 from computations.default_polynomials import DEFAULT_IRREDUCIBLE_POLYNOMIAL
-from typing import List
+from typing import List, Tuple
+import functools
 import galois
 
 
+@functools.lru_cache(maxsize=1024)
+def _resolve_irr_poly(field_n: int, irr_poly: str) -> Tuple[str, str | None]:
+    """
+    Parses irr_poly and checks its irreducibility through galois, once per (field_n, irr_poly).
+    Returns the polynomial string to use and the warning to print (or None). Both are immutable,
+    so every VBF still gets its own state and prints its own warning.
+    """
+    bits = parse_irreducible_poly_str(irr_poly)
+    if bits == 0:
+        fallback_bits = DEFAULT_IRREDUCIBLE_POLYNOMIAL.get(field_n, 0)
+        fallback_str = bitmask_to_poly_str(fallback_bits) if fallback_bits else ""
+        return fallback_str, (f"Warning: Could not parse '{irr_poly}' as a valid polynomial. "
+                              f"Falling back to default polynomial for GF(2^{field_n}).")
+
+    # If we do have an irr_poly string, but its reducible, then fallback.
+    try:
+        galois.GF(2**field_n, irreducible_poly=bits)
+        return irr_poly, None
+    except ValueError as exc:
+        if "is reducible" in str(exc).lower():
+            fallback_bits = DEFAULT_IRREDUCIBLE_POLYNOMIAL.get(field_n, 0)
+            fallback_str = bitmask_to_poly_str(fallback_bits) if fallback_bits else ""
+            return fallback_str, (f"Warning: The user-specified polynomial '{irr_poly}' is not irreducible. "
+                                  f"Falling back to default polynomial for GF(2^{field_n}).")
+        raise
+
+
 class VBF:
     def __init__(self, uni_poly_data, field_n, irr_poly):
         """
@@ -19,27 +47,9 @@ class VBF:
             self.irr_poly = fallback_str
         else:
             # If we do have an irr_poly string, then parse and check irreducibility.
-            bits = parse_irreducible_poly_str(irr_poly)
-            if bits == 0:
-                print(f"Warning: Could not parse '{irr_poly}' as a valid polynomial. "
-                      f"Falling back to default polynomial for GF(2^{field_n}).")
-                fallback_bits = DEFAULT_IRREDUCIBLE_POLYNOMIAL.get(field_n, 0)
-                fallback_str = bitmask_to_poly_str(fallback_bits) if fallback_bits else ""
-                self.irr_poly = fallback_str
-            else:
-                # If we do have an irr_poly string, but its reducible, then fallback.
-                try:
-                    galois.GF(2**field_n, irreducible_poly=bits)
-                    self.irr_poly = irr_poly
-                except ValueError as exc:
-                    if "is reducible" in str(exc).lower():
-                        print(f"Warning: The user-specified polynomial '{irr_poly}' is not irreducible. "
-                              f"Falling back to default polynomial for GF(2^{field_n}).")
-                        fallback_bits = DEFAULT_IRREDUCIBLE_POLYNOMIAL.get(field_n, 0)
-                        fallback_str = bitmask_to_poly_str(fallback_bits) if fallback_bits else ""
-                        self.irr_poly = fallback_str
-                    else:
-                        raise
+            self.irr_poly, warning_message = _resolve_irr_poly(field_n, irr_poly)
+            if warning_message:
+                print(warning_message)
 
         self.field_n = field_n
         self.invariants = {}
@@ -89,6 +99,29 @@ class VBF:
         tt_rep = TruthTableRepresentation(tt_list)
         return cls.from_representation(tt_rep, field_n, irr_poly)
 
+    @classmethod
+    def from_cached_tt_fast(cls, tt_list: List[int], field_n: int, irr_poly: str, uni_poly_data=None):
+        """
+        Builds a VBF from a truth table that was already validated when it was cached.
+        Skips the irreducibility check and the Lagrange interpolation. Without uni_poly_data,
+        the polynomial is derived lazily by the representation property.
+        """
+        vbf_object = cls.__new__(cls)
+        if irr_poly:
+            vbf_object.irr_poly = irr_poly
+        else:
+            fallback_bits = DEFAULT_IRREDUCIBLE_POLYNOMIAL.get(field_n, 0)
+            vbf_object.irr_poly = bitmask_to_poly_str(fallback_bits) if fallback_bits else ""
+
+        vbf_object.field_n = field_n
+        vbf_object.invariants = {}
+        vbf_object._cached_tt_list = tt_list
+        if uni_poly_data:
+            vbf_object._representation = UnivariatePolynomialRepresentation(uni_poly_data)
+        else:
+            vbf_object._representation = None
+        return vbf_object
+
     def _get_truth_table_list(self) -> List[int]:
         if self._cached_tt_list:
             return self._cached_tt_list